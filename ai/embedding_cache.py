@@ -0,0 +1,144 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import numpy as np
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially reformatted texts share a cache entry."""
+    return " ".join(text.split())
+
+
+def make_cache_key(model_name: str, text: str) -> str:
+    """Content address of an embedding: hash of the model name and the normalized text."""
+    return hashlib.sha256(f"{model_name}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Two-tier embedding cache: an in-memory LRU in front of a SQLite table.
+
+    Entries are keyed by make_cache_key(), so the same text encoded by a
+    different model never collides. Both tiers are bounded by item count and
+    evict the least recently used entries first.
+    """
+
+    def __init__(self, path: str, model_name: str, max_memory_items: int = 10_000, max_disk_items: int = 1_000_000):
+        self.path = path
+        self.model_name = model_name
+        self.max_memory_items = max_memory_items
+        self.max_disk_items = max_disk_items
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embedding ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS ix_embedding_last_access ON embedding (last_access)")
+        self._connection.commit()
+        self._disk_items = self._connection.execute("SELECT COUNT(*) FROM embedding").fetchone()[0]
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current tier sizes."""
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "memory_items": len(self._memory),
+                "disk_items": self._disk_items,
+            }
+
+    def get_many(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Look up embeddings for texts, returning None where there is no entry."""
+        keys = [make_cache_key(self.model_name, text) for text in texts]
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        with self._lock:
+            disk_lookups = {}
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    results[i] = vector
+                else:
+                    disk_lookups.setdefault(key, []).append(i)
+            
+            if disk_lookups:
+                found = self._read_disk(list(disk_lookups))
+                for key, indexes in disk_lookups.items():
+                    vector = found.get(key)
+                    if vector is None:
+                        self.misses += len(indexes)
+                        continue
+                    self.disk_hits += len(indexes)
+                    self._remember(key, vector)
+                    for i in indexes:
+                        results[i] = vector
+        return results
+
+    def put_many(self, texts: List[str], vectors: np.ndarray) -> None:
+        """Store embeddings in both tiers, evicting the oldest entries past the size limits."""
+        now = time.time()
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = make_cache_key(self.model_name, text)
+                vector = np.asarray(vector, dtype=np.float32)
+                self._remember(key, vector)
+                rows.append((key, vector.tobytes(), now))
+            # Embeddings are immutable per key, so existing rows are left alone
+            inserted = self._connection.executemany(
+                "INSERT OR IGNORE INTO embedding (key, vector, last_access) VALUES (?, ?, ?)", rows
+            ).rowcount
+            self._disk_items += max(inserted, 0)
+            excess = self._disk_items - self.max_disk_items
+            if excess > 0:
+                self._connection.execute(
+                    "DELETE FROM embedding WHERE key IN ("
+                    "SELECT key FROM embedding ORDER BY last_access LIMIT ?)",
+                    (excess,)
+                )
+                self._disk_items -= excess
+            self._connection.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._connection.execute("DELETE FROM embedding")
+            self._connection.commit()
+            self._disk_items = 0
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        now = time.time()
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for key, blob in self._connection.execute(
+                f"SELECT key, vector FROM embedding WHERE key IN ({placeholders})", chunk
+            ):
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        if found:
+            self._connection.executemany(
+                "UPDATE embedding SET last_access = ? WHERE key = ?", [(now, key) for key in found]
+            )
+            self._connection.commit()
+        return found
@@ -0,0 +1,180 @@
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import List, Optional
+from core.config import Config
+
+# Job states, in the order a job goes through them
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+_service = None
+_service_lock = threading.Lock()
+
+
+class EvaluationService:
+    """Background evaluation workers fed by a shared job queue.
+
+    submit() returns a job id straight away; get_job() reports the job's status
+    and, once done, the stored evaluation. Each worker waits up to
+    `batch_window_ms` after the first queued job for more to arrive and scores
+    up to `max_batch_size` of them with one evaluate_batch() call, so
+    concurrent requests share a single encoder pass. Workers are threads and
+    share the process-wide sentence model.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_batch_size: Optional[int] = None,
+        batch_window_ms: Optional[int] = None,
+        max_finished_jobs: Optional[int] = None
+    ):
+        self.max_batch_size = max_batch_size or Config.EVALUATION_MAX_BATCH_SIZE
+        self.batch_window = (batch_window_ms if batch_window_ms is not None else Config.EVALUATION_BATCH_WINDOW_MS) / 1000
+        self.max_finished_jobs = max_finished_jobs or Config.EVALUATION_MAX_FINISHED_JOBS
+        self._queue = queue.Queue()
+        self._jobs = OrderedDict()
+        self._jobs_lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._run_worker, name=f"evaluation-worker-{i}", daemon=True)
+            for i in range(workers or Config.EVALUATION_WORKERS)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(
+        self,
+        llm_response: str,
+        actual_response: str,
+        notes: str = None,
+        record_timings: bool = False,
+        profile: Optional[str] = None
+    ) -> str:
+        """Queue an evaluation and return its job id.
+
+        With `record_timings` (or a `profile`) the job is scored on its own
+        with evaluate_response, outside any batch, and its timing breakdown is
+        kept in the job's `timings`.
+        """
+        job_id = uuid.uuid4().hex
+        with self._jobs_lock:
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": JOB_QUEUED,
+                "submitted_at": time.time(),
+                "finished_at": None,
+                "result": None,
+                "timings": None,
+                "error": None
+            }
+        options = {"record_timings": record_timings or bool(profile), "profile": profile}
+        self._queue.put((job_id, llm_response, actual_response, notes, options))
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        """Status of a job: a copy of its record, or None for unknown or expired jobs.
+
+        `result` holds the stored evaluation (as a dict) once the status is
+        "done", plus `timings` for timed jobs; `error` holds the message when
+        it is "failed".
+        """
+        with self._jobs_lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self) -> dict:
+        with self._jobs_lock:
+            statuses = [job["status"] for job in self._jobs.values()]
+        return {
+            "workers": len(self._workers),
+            "queued": statuses.count(JOB_QUEUED),
+            "running": statuses.count(JOB_RUNNING),
+            "done": statuses.count(JOB_DONE),
+            "failed": statuses.count(JOB_FAILED)
+        }
+
+    def _next_batch(self) -> List[tuple]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _update_job(self, job_id: str, **fields) -> None:
+        with self._jobs_lock:
+            self._jobs[job_id].update(fields)
+            if fields.get("status") in (JOB_DONE, JOB_FAILED):
+                self._jobs.move_to_end(job_id)
+                self._prune_finished_jobs()
+
+    def _prune_finished_jobs(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job["status"] in (JOB_DONE, JOB_FAILED)]
+        for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+            del self._jobs[job_id]
+
+    def _run_worker(self) -> None:
+        from ai.evaluator import evaluate_batch, evaluate_response, get_overall_score
+
+        while True:
+            batch = self._next_batch()
+            for job_id, *_ in batch:
+                self._update_job(job_id, status=JOB_RUNNING)
+
+            # Timed jobs run alone so their breakdown does not include other requests
+            timed_jobs = [job for job in batch if job[4]["record_timings"]]
+            batched_jobs = [job for job in batch if not job[4]["record_timings"]]
+
+            for job_id, llm_response, actual_response, notes, options in timed_jobs:
+                try:
+                    timings = {}
+                    scores = evaluate_response(llm_response, actual_response, timings=timings, profile=options["profile"])
+                except Exception as e:
+                    self._fail_jobs([job_id], e)
+                    continue
+                self._store_result(job_id, llm_response, actual_response, notes, scores, get_overall_score(scores), timings)
+
+            if not batched_jobs:
+                continue
+            try:
+                results = evaluate_batch([(llm_response, actual_response) for _, llm_response, actual_response, _, _ in batched_jobs])
+            except Exception as e:
+                self._fail_jobs([job_id for job_id, *_ in batched_jobs], e)
+                continue
+
+            for (job_id, llm_response, actual_response, notes, _), scores in zip(batched_jobs, results.to_dict(orient="records")):
+                overall_score = scores.pop("overall_score")
+                self._store_result(job_id, llm_response, actual_response, notes, scores, overall_score)
+
+    def _fail_jobs(self, job_ids: List[str], error: Exception) -> None:
+        for job_id in job_ids:
+            self._update_job(job_id, status=JOB_FAILED, finished_at=time.time(), error=str(error))
+
+    def _store_result(self, job_id, llm_response, actual_response, notes, scores, overall_score, timings=None) -> None:
+        from repositories.evaluation import create_evaluation
+
+        try:
+            evaluation = create_evaluation(llm_response, actual_response, scores, overall_score, notes)
+        except Exception as e:
+            self._fail_jobs([job_id], e)
+            return
+        self._update_job(job_id, status=JOB_DONE, finished_at=time.time(), result=evaluation.model_dump(), timings=timings)
+
+
+def get_evaluation_service() -> EvaluationService:
+    """Process-wide EvaluationService, started on first use."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = EvaluationService()
+        return _service
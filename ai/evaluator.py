@@ -1,37 +1,318 @@
-from typing import Dict
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
 from models.enums import EvaluationCriteria
-from ai.evaluator_utils import calculate_relevance, calculate_accuracy, calculate_coherence, calculate_completeness, calculate_creativity, calculate_tone, calculate_alignment_with_intent
+from ai.instrumentation import emit_timings, has_metrics_hooks, profiled, timed
+from ai.evaluator_utils import TextAnalysis, TextInput, analyze_text, config_snapshot, get_embedding_cache, init_scoring_worker, calculate_semantic_similarity, calculate_semantic_similarities
+from ai.registry import CONTENT_WORDS, EMBEDDING, READABILITY, SENTENCES, WORDS, CriterionInput, list_metrics, required_artifacts, resolve_metrics, uses_default_metrics
 from core.config import Config
 
+_scoring_pool = None
+_scoring_pool_workers = 0
+_scoring_pool_config = None
+_scoring_pool_lock = threading.Lock()
 
-def evaluate_response(llm_response: str, actual_response: str) -> Dict[str, float]:
+
+def evaluate_response(
+    llm_response: str,
+    actual_response: str,
+    timings: Optional[dict] = None,
+    profile: Optional[str] = None,
+    criteria: Optional[Iterable[CriterionInput]] = None
+) -> Dict[str, float]:
+    """
+    Score one response against the actual response
+    
+    `criteria` limits scoring to those criteria (names or EvaluationCriteria;
+    all by default). Only the shared artifacts they need are computed, so the
+    encoder is skipped unless relevance, creativity or alignment is asked for.
+    
+    Pass an empty dict as `timings` to have it filled with a breakdown of the
+    evaluation (see _evaluate_instrumented). Timing is also switched on while
+    a metrics hook is registered, and `profile` ("cprofile" or
+    "pyinstrument") adds a profiler report to the timings.
+    """
+    criteria = _criterion_names(criteria)
+    if timings is None and (profile or has_metrics_hooks()):
+        timings = {}
+    if timings is not None:
+        return _evaluate_instrumented(llm_response, actual_response, timings, profile, criteria)
+    
     if not llm_response or not actual_response:
-        return {criterion: 0.0 for criterion in Config.EVALUATION_CRITERIA_LIST}
+        return _zero_scores(criteria)
     
-    scores = {}
+    # Tokenize each text once and share the analysis across all metrics
+    llm = analyze_text(llm_response)
+    actual = analyze_text(actual_response)
     
-    # Relevance: Semantic similarity between LLM and actual response
-    scores[EvaluationCriteria.RELEVANCE.value] = calculate_relevance(llm_response, actual_response)
+    # Encode both texts in one batched call; None falls back to lexical similarity
+    metrics = resolve_metrics(criteria)
+    similarity = calculate_semantic_similarity(llm, actual) if EMBEDDING in required_artifacts(metrics) else None
     
-    # Accuracy: Content accuracy and factual correctness
-    scores[EvaluationCriteria.ACCURACY.value] = calculate_accuracy(llm_response, actual_response)
+    return _score_pair(llm, actual, similarity, criteria=criteria)
+
+def _evaluate_instrumented(
+    llm_response: str,
+    actual_response: str,
+    timings: dict,
+    profile: Optional[str],
+    criteria: Optional[Tuple[str, ...]] = None
+) -> Dict[str, float]:
+    """
+    evaluate_response with a breakdown recorded into `timings`:
     
-    # Coherence: Logical flow and readability
-    scores[EvaluationCriteria.COHERENCE.value] = calculate_coherence(llm_response)
+    - total_s: wall time of the whole evaluation
+    - steps: seconds spent on shared preprocessing (word tokenization,
+      sentence tokenization, readability, encoding), for the steps the
+      selected criteria need
+    - criteria: seconds spent in each criterion once the shared work is done
+    - embedding_cache: memory/disk hits and misses during this evaluation
+      (None without a cache or encoding; concurrent evaluations are counted too)
+    - text_sizes: characters, whitespace-separated words and (when tokenized)
+      sentences of each side
+    - profile: profiler report, or None
     
-    # Completeness: Coverage of expected content
-    scores[EvaluationCriteria.COMPLETENESS.value] = calculate_completeness(llm_response, actual_response)
+    The shared artifacts the selected criteria need are computed up front,
+    step by step, so their cost shows up under `steps` instead of in
+    whichever criterion needs them first.
+    """
+    started = time.perf_counter()
+    steps = timings.setdefault("steps", {})
+    criterion_timings = timings.setdefault("criteria", {})
+    timings["embedding_cache"] = None
+    timings["text_sizes"] = {}
     
-    # Creativity: Originality and unique expression
-    scores[EvaluationCriteria.CREATIVITY.value] = calculate_creativity(llm_response, actual_response)
+    with profiled(profile) as profile_result:
+        if not llm_response or not actual_response:
+            scores = _zero_scores(criteria)
+        else:
+            llm = analyze_text(llm_response)
+            actual = analyze_text(actual_response)
+            artifacts = required_artifacts(resolve_metrics(criteria))
+            _prepare_artifacts([llm], [actual], artifacts, steps)
     
-    # Tone: Appropriateness and consistency
-    scores[EvaluationCriteria.TONE.value] = calculate_tone(llm_response)
+            similarity = None
+            if EMBEDDING in artifacts:
+                # Opening the cache loads the model, which counts as encoding time
+                with timed(steps, "encode"):
+                    cache = get_embedding_cache()
+                    cache_before = cache.stats() if cache else None
+                    similarity = calculate_semantic_similarity(llm, actual)
+                if cache:
+                    cache_after = cache.stats()
+                    timings["embedding_cache"] = {key: cache_after[key] - cache_before[key] for key in ("memory_hits", "disk_hits", "misses")}
     
-     # Alignment with intent: How well it matches user's intended purpose
-    scores[EvaluationCriteria.ALIGNMENT_WITH_INTENT.value] = calculate_alignment_with_intent(llm_response, actual_response)
+            scores = _score_pair(llm, actual, similarity, timings=criterion_timings, criteria=criteria)
+            timings["text_sizes"] = _text_sizes([llm], [actual])
+            if SENTENCES in artifacts:
+                timings["text_sizes"]["llm_response"]["sentences"] = len(llm.sentences)
     
+    timings["total_s"] = time.perf_counter() - started
+    timings["profile"] = profile_result["report"]
+    emit_timings(timings)
     return scores
 
+def evaluate_batch(
+    pairs: Iterable[Tuple[str, str]],
+    batch_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    criteria: Optional[Iterable[CriterionInput]] = None
+) -> pd.DataFrame:
+    """
+    Evaluate many (llm_response, actual_response) pairs at once
+    
+    All texts are encoded together in batches of `batch_size` (defaults to
+    Config.EMBEDDING_BATCH_SIZE), so the encoder runs once per batch instead of
+    once per pair. With `workers` > 1 (defaults to Config.SCORING_WORKERS) the
+    lexical metrics are computed by a process pool in chunks of
+    Config.SCORING_CHUNK_SIZE pairs; the results are identical either way.
+    `criteria` selects the criteria to score, as in evaluate_response.
+    
+    Each distinct text is analyzed and encoded once, and each distinct pair
+    is scored once; repeated pairs get copies of the same scores.
+    
+    While a metrics hook is registered, each call emits one timings dict for
+    the whole batch, shaped like evaluate_response's plus `pairs`; its
+    `steps` add "score", which covers tokenization when a pool is used.
+    
+    Returns:
+        DataFrame with one row per pair, in input order, holding a column per
+        selected criterion plus `overall_score`
+    """
+    # Pairs may come as lists (e.g. DataFrame.values.tolist()); tuples can be deduplicated
+    started = time.perf_counter()
+    # Batches are only timed for the metrics hooks
+    timings = {"steps": {}, "criteria": {}, "embedding_cache": None} if has_metrics_hooks() else None
+    steps = timings["steps"] if timings is not None else None
+    
+    input_pairs = [tuple(pair) for pair in pairs]
+    criteria = _criterion_names(criteria)
+    workers = Config.SCORING_WORKERS if workers is None else workers
+    
+    # Scores depend on the exact texts, so only exact duplicates are merged
+    pairs = list(dict.fromkeys(input_pairs))
+    analyses = {text: analyze_text(text) for pair in pairs for text in pair}
+    llm_analyses = [analyses[llm_response] for llm_response, _ in pairs]
+    actual_analyses = [analyses[actual_response] for _, actual_response in pairs]
+    
+    # The encoder stays in this process; workers only get the similarities
+    artifacts = required_artifacts(resolve_metrics(criteria))
+    similarities = None
+    if EMBEDDING in artifacts:
+        with timed(steps, "encode"):
+            cache = get_embedding_cache() if timings is not None else None
+            cache_before = cache.stats() if cache else None
+            similarities = calculate_semantic_similarities(llm_analyses, actual_analyses, batch_size=batch_size)
+        if cache:
+            cache_after = cache.stats()
+            timings["embedding_cache"] = {key: cache_after[key] - cache_before[key] for key in ("memory_hits", "disk_hits", "misses")}
+    similarities = [None] * len(pairs) if similarities is None else [None if np.isnan(s) else float(s) for s in similarities]
+    
+    chunk_size = Config.SCORING_CHUNK_SIZE
+    # Workers re-import the registry, so custom metrics would be lost there
+    if workers > 1 and len(pairs) > chunk_size and uses_default_metrics():
+        chunks = [
+            [(llm.text, actual.text, similarity) for llm, actual, similarity in zip(
+                llm_analyses[i:i + chunk_size], actual_analyses[i:i + chunk_size], similarities[i:i + chunk_size]
+            )]
+            for i in range(0, len(pairs), chunk_size)
+        ]
+        # map() yields chunk results in submission order
+        score_chunk = partial(_score_chunk, criteria=criteria)
+        with timed(steps, "score"):
+            rows = [row for chunk_rows in _get_scoring_pool(workers).map(score_chunk, chunks) for row in chunk_rows]
+    else:
+        if timings is not None:
+            _prepare_artifacts(llm_analyses, actual_analyses, artifacts, steps)
+        with timed(steps, "score"):
+            rows = _score_chunk(
+                list(zip(llm_analyses, actual_analyses, similarities)),
+                criteria=criteria,
+                timings=timings["criteria"] if timings is not None else None
+            )
+    
+    selected = [criterion for criterion in Config.EVALUATION_CRITERIA_LIST if criteria is None or criterion.value in criteria]
+    columns = [criterion.value for criterion in selected]
+    results = pd.DataFrame(rows, columns=columns)
+    weights = np.array([Config.EVALUATION_CRITERIA_WEIGHTS[criterion] for criterion in selected])
+    results["overall_score"] = results[columns].to_numpy() @ weights
+    if len(selected) < len(Config.EVALUATION_CRITERIA_LIST):
+        results["overall_score"] /= weights.sum() or 1.0
+    
+    if len(pairs) != len(input_pairs):
+        positions = {pair: i for i, pair in enumerate(pairs)}
+        results = results.iloc[[positions[pair] for pair in input_pairs]].reset_index(drop=True)
+    
+    if timings is not None:
+        timings["pairs"] = len(input_pairs)
+        timings["text_sizes"] = _text_sizes(llm_analyses, actual_analyses)
+        timings["total_s"] = time.perf_counter() - started
+        timings["profile"] = None
+        emit_timings(timings)
+    return results
+
+def _prepare_artifacts(
+    llm_analyses: List[TextAnalysis],
+    actual_analyses: List[TextAnalysis],
+    artifacts: FrozenSet[str],
+    steps: dict
+) -> None:
+    # Compute the lexical artifacts in `artifacts` ahead of scoring, timing each step into `steps`
+    if WORDS in artifacts or CONTENT_WORDS in artifacts:
+        with timed(steps, "tokenize_words"):
+            for analysis in (*llm_analyses, *actual_analyses):
+                analysis.content_words if CONTENT_WORDS in artifacts else analysis.word_set
+    if SENTENCES in artifacts:
+        with timed(steps, "tokenize_sentences"):
+            for llm in llm_analyses:
+                llm.sentence_lengths
+    if READABILITY in artifacts:
+        with timed(steps, "readability"):
+            for llm in llm_analyses:
+                llm.readability
+
+def _text_sizes(llm_analyses: List[TextAnalysis], actual_analyses: List[TextAnalysis]) -> Dict[str, Dict[str, int]]:
+    return {
+        side: {"chars": sum(len(analysis.text) for analysis in analyses), "words": sum(len(analysis.text.split()) for analysis in analyses)}
+        for side, analyses in (("llm_response", llm_analyses), ("actual_response", actual_analyses))
+    }
+
+def _get_scoring_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool for lexical scoring, reused across batches while `workers` and Config stay the same"""
+    global _scoring_pool, _scoring_pool_workers, _scoring_pool_config
+    config = config_snapshot()
+    with _scoring_pool_lock:
+        if _scoring_pool is None or _scoring_pool_workers != workers or _scoring_pool_config != config:
+            if _scoring_pool is not None:
+                _scoring_pool.shutdown()
+            # spawn rather than fork: forking after torch has started its threads can deadlock
+            _scoring_pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_scoring_worker,
+                initargs=(config,)
+            )
+            _scoring_pool_workers = workers
+            _scoring_pool_config = config
+        return _scoring_pool
+
+def _score_chunk(
+    chunk: List[Tuple[TextInput, TextInput, Optional[float]]],
+    criteria: Optional[Tuple[str, ...]] = None,
+    timings: Optional[dict] = None
+) -> List[Dict[str, float]]:
+    """Score (llm_response, actual_response, similarity) triples; also runs in pool workers"""
+    rows = []
+    for llm_response, actual_response, similarity in chunk:
+        llm, actual = analyze_text(llm_response), analyze_text(actual_response)
+        if not llm.text or not actual.text:
+            rows.append(_zero_scores(criteria))
+            continue
+        rows.append(_score_pair(llm, actual, similarity, timings=timings, criteria=criteria))
+    return rows
+
+def _score_pair(
+    llm: TextAnalysis,
+    actual: TextAnalysis,
+    similarity: Optional[float],
+    timings: Optional[dict] = None,
+    criteria: Optional[Tuple[str, ...]] = None
+) -> Dict[str, float]:
+    # Metrics run in registry order, after the ones they depend on
+    scores = {}
+    for metric in resolve_metrics(criteria):
+        with timed(timings, metric.criterion.value):
+            scores[metric.criterion.value] = metric.func(llm, actual, similarity, scores)
+    
+    if criteria is None:
+        return scores
+    return {criterion: score for criterion, score in scores.items() if criterion in criteria}
+
+def _criterion_names(criteria: Optional[Iterable[CriterionInput]]) -> Optional[Tuple[str, ...]]:
+    # Validated names in scoring order (picklable for pool workers); None means every criterion
+    if criteria is None:
+        return None
+    names = {EvaluationCriteria(criterion).value for criterion in criteria}
+    return tuple(metric.criterion.value for metric in list_metrics() if metric.criterion.value in names)
+
+def _zero_scores(criteria: Optional[Tuple[str, ...]] = None) -> Dict[str, float]:
+    return {criterion.value: 0.0 for criterion in Config.EVALUATION_CRITERIA_LIST if criteria is None or criterion.value in criteria}
+
 def get_overall_score(scores: Dict[str, float]) -> float:
-    return sum(scores[criterion.value] * Config.EVALUATION_CRITERIA_WEIGHTS[criterion] for criterion in Config.EVALUATION_CRITERIA_LIST)
\ No newline at end of file
+    """
+    Weighted sum of the criterion scores
+    
+    When only some criteria were evaluated, the weights of those present are
+    rescaled to sum to one.
+    """
+    present = [criterion for criterion in Config.EVALUATION_CRITERIA_LIST if criterion.value in scores]
+    overall_score = sum(scores[criterion.value] * Config.EVALUATION_CRITERIA_WEIGHTS[criterion] for criterion in present)
+    if len(present) == len(Config.EVALUATION_CRITERIA_LIST):
+        return overall_score
+    total_weight = sum(Config.EVALUATION_CRITERIA_WEIGHTS[criterion] for criterion in present)
+    return overall_score / total_weight if total_weight else 0.0
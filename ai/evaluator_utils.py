@@ -1,50 +1,466 @@
+import logging
 import re
+import threading
+import warnings
 import numpy as np
-import nltk
-from sklearn.metrics.pairwise import cosine_similarity
-from nltk.corpus import stopwords
+from functools import cached_property
+from typing import Dict, List, Optional, Set, Union
 from textstat import flesch_reading_ease
-from nltk.tokenize import sent_tokenize
-from sentence_transformers import SentenceTransformer
+from core.config import Config
+from ai.embedding_cache import EmbeddingCache
+from ai.fast_text import TextStats, compute_text_stats
 
-nltk.download('punkt')
-nltk.download('stopwords')
+# NLTK corpora, the SentenceTransformer model and the embedding cache are all
+# loaded on first use (or by warm_up()), so importing this module is cheap and
+# never touches the network.
+logger = logging.getLogger(__name__)
 
-STOP_WORDS = set(stopwords.words('english'))
+_nltk_available: Dict[str, bool] = {}
+_nltk_lock = threading.Lock()
+_stop_words = None
+_sentence_model = None
+_sentence_model_loaded = False
+_sentence_model_backend = None
+_sentence_model_lock = threading.Lock()
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+_warm_up_thread = None
+_warm_up_lock = threading.Lock()
 
-# Initialize SentenceTransformer model
-try:
-    sentence_model = SentenceTransformer('all-MiniLM-L6-v2')
-except:
-    sentence_model = None
 
-def calculate_relevance(llm_response: str, actual_response: str) -> float:
-    """Semantic similarity with embedding fallback to Jaccard."""
-    if not llm_response or not actual_response:
-        return 0.0
+def ensure_nltk_data(*names: str) -> bool:
+    """Check the named NLTK resources (all of Config.NLTK_RESOURCES by default) are installed locally.
+
+    Missing resources are downloaded unless Config.OFFLINE_MODE is set. Each
+    resource is checked once per process; returns True if all are available.
+    """
+    import nltk
+    with _nltk_lock:
+        for name in names or Config.NLTK_RESOURCES:
+            if name not in _nltk_available:
+                try:
+                    nltk.data.find(Config.NLTK_RESOURCES[name])
+                    _nltk_available[name] = True
+                except LookupError:
+                    _nltk_available[name] = not Config.OFFLINE_MODE and bool(nltk.download(name, quiet=True))
+        return all(_nltk_available[name] for name in names or Config.NLTK_RESOURCES)
+
+
+def _require_nltk_data(*names: str) -> None:
+    # Raise a readable error unless one of the named resources is available,
+    # trying them in order so the later ones are only fetched when needed
+    if any(ensure_nltk_data(name) for name in names):
+        return
+    reason = "LLM_EVAL_OFFLINE is set" if Config.OFFLINE_MODE else "it could not be downloaded"
+    raise LookupError(
+        f"NLTK resource {names[0]!r} is not installed and {reason}; "
+        f"install it with `python -m nltk.downloader {names[0]}`"
+    )
+
+
+def get_stop_words() -> Set[str]:
+    """English stopwords, loaded on first use.
+
+    Raises:
+        LookupError: if the stopwords corpus is missing and cannot be downloaded
+    """
+    global _stop_words
+    if _stop_words is None:
+        _require_nltk_data("stopwords")
+        from nltk.corpus import stopwords
+        _stop_words = set(stopwords.words('english'))
+    return _stop_words
+
+
+def tokenize_sentences(text: str) -> List[str]:
+    """Split text into sentences with NLTK's Punkt tokenizer.
+
+    Raises:
+        LookupError: if the Punkt model is missing and cannot be downloaded
+    """
+    # Recent NLTK releases load punkt_tab, older ones punkt
+    _require_nltk_data("punkt_tab", "punkt")
+    from nltk.tokenize import sent_tokenize
+    return sent_tokenize(text)
+
+
+def load_sentence_model(backend: Optional[str] = None):
+    """Load a SentenceTransformer for Config.SENTENCE_MODEL_NAME on the given encoder backend.
+
+    Backends (Config.ENCODER_BACKEND by default):
+    - "torch": fp32 PyTorch
+    - "torch_int8": PyTorch with Linear layers dynamically quantized to int8
+    - "onnx": ONNX Runtime (needs the `onnx` extra)
+    - "onnx_int8": ONNX Runtime with the int8 model file Config.ENCODER_ONNX_INT8_FILE
+
+    Config.ENCODER_THREADS > 0 sets the CPU threads of the backend.
+    """
+    backend = backend or Config.ENCODER_BACKEND
+    threads = Config.ENCODER_THREADS
+    from sentence_transformers import SentenceTransformer
+    
+    if backend in ("torch", "torch_int8"):
+        if threads or backend == "torch_int8":
+            import torch
+        if threads:
+            torch.set_num_threads(threads)
+        model = SentenceTransformer(Config.SENTENCE_MODEL_NAME, device="cpu" if backend == "torch_int8" else None, local_files_only=Config.OFFLINE_MODE)
+        if backend == "torch_int8":
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model
+    
+    if backend in ("onnx", "onnx_int8"):
+        model_kwargs = {"provider": "CPUExecutionProvider"}
+        if threads:
+            import onnxruntime
+            session_options = onnxruntime.SessionOptions()
+            session_options.intra_op_num_threads = threads
+            model_kwargs["session_options"] = session_options
+        if backend == "onnx_int8":
+            model_kwargs["file_name"] = Config.ENCODER_ONNX_INT8_FILE
+        return SentenceTransformer(Config.SENTENCE_MODEL_NAME, backend="onnx", model_kwargs=model_kwargs, local_files_only=Config.OFFLINE_MODE)
     
-    if sentence_model:
+    raise ValueError(f"Unknown encoder backend {backend!r}; expected torch, torch_int8, onnx or onnx_int8")
+
+
+def get_sentence_model():
+    """Shared SentenceTransformer, loaded once on first use (None if it cannot be loaded).
+
+    Falls back to the PyTorch backend if Config.ENCODER_BACKEND cannot be loaded.
+    """
+    global _sentence_model, _sentence_model_loaded, _sentence_model_backend
+    with _sentence_model_lock:
+        if not _sentence_model_loaded:
+            _sentence_model_backend = Config.ENCODER_BACKEND
+            try:
+                _sentence_model = load_sentence_model(_sentence_model_backend)
+            except Exception as e:
+                _sentence_model = None
+                if _sentence_model_backend != "torch":
+                    warnings.warn(f"Encoder backend {_sentence_model_backend!r} unavailable ({e}); using torch")
+                    _sentence_model_backend = "torch"
+                    try:
+                        _sentence_model = load_sentence_model("torch")
+                    except Exception:
+                        _sentence_model = None
+            _sentence_model_loaded = True
+        return _sentence_model
+
+
+def config_snapshot() -> Dict[str, object]:
+    """Current Config settings, for handing to processes that re-import Config with its defaults."""
+    return {name: value for name, value in vars(Config).items() if name.isupper()}
+
+
+def init_scoring_worker(config: Optional[Dict[str, object]] = None) -> None:
+    """Process pool initializer for lexical scoring workers.
+
+    Applies the parent's `config` (from config_snapshot()) so settings changed
+    at runtime reach the worker, loads NLTK data once per worker and marks
+    the sentence model as unavailable: workers get similarities from the
+    parent process and must never load their own copy of the model.
+    """
+    global _sentence_model, _sentence_model_loaded
+    for name, value in (config or {}).items():
+        setattr(Config, name, value)
+    with _sentence_model_lock:
+        _sentence_model = None
+        _sentence_model_loaded = True
+    get_stop_words()
+    if Config.TEXT_STATS_ENGINE == "nltk":
+        tokenize_sentences("Warm up.")
+
+
+def warm_up() -> None:
+    """Load NLTK data, the sentence model and the embedding cache ahead of the first evaluation.
+
+    Each step's failure is logged rather than raised, and the remaining
+    steps still run; the first evaluation reports the error again.
+    """
+    steps = [get_stop_words, get_sentence_model, get_embedding_cache]
+    # The fast text statistics engine never uses Punkt
+    if Config.TEXT_STATS_ENGINE == "nltk":
+        steps.insert(1, lambda: tokenize_sentences("Warm up."))
+    for step in steps:
         try:
-            emb_a = sentence_model.encode([llm_response])
-            emb_b = sentence_model.encode([actual_response])
-            return float(cosine_similarity(emb_a, emb_b)[0][0])
+            step()
+        except Exception as e:
+            logger.warning("Evaluator warm-up step failed: %s", e)
+
+
+def start_warm_up() -> threading.Thread:
+    """Run warm_up() once per process on a background daemon thread."""
+    global _warm_up_thread
+    with _warm_up_lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=warm_up, name="evaluator-warm-up", daemon=True)
+            _warm_up_thread.start()
+        return _warm_up_thread
+
+
+class TextAnalysis:
+    """Tokenized view of a text, shared by every metric of an evaluation.
+
+    Each artifact is computed on first access and then reused, so a text is
+    word-tokenized and sentence-tokenized at most once per evaluation. With
+    Config.TEXT_STATS_ENGINE = "fast", sentences, their lengths and the
+    readability all come from one ai.fast_text scan.
+    """
+
+    def __init__(self, text: str):
+        self.text = text or ""
+        # L2-normalized document embedding (mean of the chunk embeddings) and
+        # the chunk embeddings themselves, one row per chunk; both are filled
+        # in by embed_analyses()
+        self.embedding: Optional[np.ndarray] = None
+        self.chunk_embeddings: Optional[np.ndarray] = None
+
+    @cached_property
+    def words(self) -> List[str]:
+        return re.findall(r'\w+', self.text.lower())
+
+    @cached_property
+    def word_set(self) -> Set[str]:
+        return set(self.words)
+
+    @cached_property
+    def content_words(self) -> Set[str]:
+        return self.word_set - get_stop_words()
+
+    @cached_property
+    def text_stats(self) -> TextStats:
+        return compute_text_stats(self.text)
+
+    @cached_property
+    def sentences(self) -> List[str]:
+        if Config.TEXT_STATS_ENGINE == "fast":
+            return self.text_stats.sentences
+        return tokenize_sentences(self.text)
+
+    @cached_property
+    def sentence_lengths(self) -> List[int]:
+        if Config.TEXT_STATS_ENGINE == "fast":
+            return self.text_stats.sentence_lengths
+        return [len(s.split()) for s in self.sentences]
+
+    @cached_property
+    def chunks(self) -> List[str]:
+        """Texts to encode: the whole text, or sentence windows when it is long.
+
+        Texts longer than Config.EMBEDDING_CHUNK_WORDS words are split into
+        consecutive sentences of at most that many words (longer sentences
+        are split on words), so no chunk is truncated by the encoder. At most
+        Config.EMBEDDING_MAX_CHUNKS chunks are kept, evenly spaced over the
+        text, which bounds the encoder cost of a single huge input.
+        """
+        max_words = Config.EMBEDDING_CHUNK_WORDS
+        if len(self.text.split()) <= max_words:
+            return [self.text]
+        
+        chunks, window = [], []
+        for sentence in self.sentences:
+            words = sentence.split()
+            for start in range(0, len(words), max_words):
+                piece = words[start:start + max_words]
+                if window and len(window) + len(piece) > max_words:
+                    chunks.append(" ".join(window))
+                    window = []
+                window.extend(piece)
+        if window:
+            chunks.append(" ".join(window))
+        
+        if len(chunks) > Config.EMBEDDING_MAX_CHUNKS:
+            keep = np.linspace(0, len(chunks) - 1, Config.EMBEDDING_MAX_CHUNKS).round().astype(int)
+            chunks = [chunks[i] for i in keep]
+        return chunks
+
+    @cached_property
+    def readability(self) -> float:
+        """Flesch reading ease normalized to [0, 1] (0.5 if it cannot be computed)."""
+        try:
+            if Config.TEXT_STATS_ENGINE == "fast":
+                return max(0, min(1, self.text_stats.reading_ease / 100))
+            return max(0, min(1, flesch_reading_ease(self.text) / 100))
         except:
-            pass
+            return 0.5
+
+
+TextInput = Union[str, TextAnalysis]
+
+
+def analyze_text(text: TextInput) -> TextAnalysis:
+    """Return `text` as a TextAnalysis, reusing it if it already is one."""
+    if isinstance(text, TextAnalysis):
+        return text
+    return TextAnalysis(text)
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Shared embedding cache for the loaded encoder backend, opened on first use (None when disabled)."""
+    global _embedding_cache
+    if not Config.EMBEDDING_CACHE_ENABLED:
+        return None
+    # Load the model first: a fallback to torch changes the backend the cache is keyed on
+    get_sentence_model()
+    with _embedding_cache_lock:
+        if _embedding_cache is None:
+            # Backends give slightly different vectors, so each gets its own keys
+            backend = _sentence_model_backend or Config.ENCODER_BACKEND
+            model_name = Config.SENTENCE_MODEL_NAME if backend == "torch" else f"{Config.SENTENCE_MODEL_NAME}@{backend}"
+            _embedding_cache = EmbeddingCache(
+                Config.EMBEDDING_CACHE_PATH,
+                model_name,
+                max_memory_items=Config.EMBEDDING_CACHE_MEMORY_ITEMS,
+                max_disk_items=Config.EMBEDDING_CACHE_DISK_ITEMS
+            )
+        return _embedding_cache
+
+
+def encode_texts(texts: List[str], batch_size: Optional[int] = None) -> Optional[np.ndarray]:
+    """Encode texts into L2-normalized rows (None without a model).
+
+    Cached embeddings are reused; the remaining texts are encoded in a single
+    batched call and added to the cache.
+    """
+    sentence_model = get_sentence_model()
+    if not sentence_model:
+        return None
+    
+    cache = get_embedding_cache()
+    cached = cache.get_many(texts) if cache else [None] * len(texts)
+    missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+    
+    encoded = {}
+    if missing:
+        try:
+            vectors = sentence_model.encode(
+                missing,
+                batch_size=batch_size or Config.EMBEDDING_BATCH_SIZE,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+        except:
+            return None
+        if cache:
+            cache.put_many(missing, vectors)
+        encoded = dict(zip(missing, vectors))
+    
+    return np.stack([vector if vector is not None else encoded[text] for text, vector in zip(texts, cached)])
+
+
+def embed_analyses(*analyses: TextAnalysis, batch_size: Optional[int] = None) -> bool:
+    """Attach embeddings to the analyses that lack one, using one encoder call.
+
+    The chunks of every pending analysis are encoded together; each analysis
+    gets its chunk embeddings and their normalized mean as its embedding.
+    Returns True if every analysis ends up with an embedding.
+    """
+    # An analysis shared by several pairs is encoded once
+    pending = list({id(analysis): analysis for analysis in analyses if analysis.embedding is None}.values())
+    if pending:
+        chunks = [analysis.chunks for analysis in pending]
+        embeddings = encode_texts([chunk for text_chunks in chunks for chunk in text_chunks], batch_size=batch_size)
+        if embeddings is None:
+            return False
+        start = 0
+        for analysis, text_chunks in zip(pending, chunks):
+            analysis.chunk_embeddings = embeddings[start:start + len(text_chunks)]
+            start += len(text_chunks)
+            analysis.embedding = _mean_pool(analysis.chunk_embeddings)
+    return True
+
+
+def _mean_pool(chunk_embeddings: np.ndarray) -> np.ndarray:
+    if len(chunk_embeddings) == 1:
+        return chunk_embeddings[0]
+    mean = chunk_embeddings.mean(axis=0)
+    norm = np.linalg.norm(mean)
+    return mean / norm if norm else mean
+
+
+def _pooled_similarity(llm: TextAnalysis, actual: TextAnalysis) -> float:
+    """Document similarity of two embedded analyses, pooled per Config.EMBEDDING_POOLING.
+
+    "mean" compares the mean chunk embeddings; "max_sim" matches every chunk
+    with its most similar chunk on the other side and averages both
+    directions, so a long answer is not diluted by unrelated passages. Single
+    chunk texts give the plain cosine similarity either way.
+    """
+    if Config.EMBEDDING_POOLING == "max_sim" and (len(llm.chunk_embeddings) > 1 or len(actual.chunk_embeddings) > 1):
+        similarities = llm.chunk_embeddings @ actual.chunk_embeddings.T
+        return float((similarities.max(axis=1).mean() + similarities.max(axis=0).mean()) / 2)
+    return float(np.dot(llm.embedding, actual.embedding))
+
+
+def calculate_semantic_similarity(llm_response: TextInput, actual_response: TextInput) -> Optional[float]:
+    """Cosine similarity of the two texts (chunk-pooled when long), or None if the encoder is unavailable."""
+    llm, actual = analyze_text(llm_response), analyze_text(actual_response)
+    if not llm.text or not actual.text:
+        return None
+    if not embed_analyses(llm, actual):
+        return None
+    return _pooled_similarity(llm, actual)
+
+
+def calculate_semantic_similarities(
+    llm_analyses: List[TextAnalysis],
+    actual_analyses: List[TextAnalysis],
+    batch_size: Optional[int] = None
+) -> Optional[np.ndarray]:
+    """Row-wise cosine similarity for aligned lists of analyses.
+
+    All texts are encoded together in batches of `batch_size`. Pairs with an
+    empty side get NaN. Returns None if the encoder is unavailable.
+    """
+    similarities = np.full(len(llm_analyses), np.nan)
+    valid = [i for i, (llm, actual) in enumerate(zip(llm_analyses, actual_analyses)) if llm.text and actual.text]
+    if not valid:
+        return similarities
+    
+    llm_valid = [llm_analyses[i] for i in valid]
+    actual_valid = [actual_analyses[i] for i in valid]
+    if not embed_analyses(*llm_valid, *actual_valid, batch_size=batch_size):
+        return None
+    
+    if Config.EMBEDDING_POOLING == "max_sim":
+        similarities[valid] = [_pooled_similarity(llm, actual) for llm, actual in zip(llm_valid, actual_valid)]
+        return similarities
+    
+    emb_a = np.stack([analysis.embedding for analysis in llm_valid])
+    emb_b = np.stack([analysis.embedding for analysis in actual_valid])
+    similarities[valid] = np.einsum('ij,ij->i', emb_a, emb_b)
+    return similarities
+
+
+def calculate_relevance(llm_response: TextInput, actual_response: TextInput, similarity: Optional[float] = None) -> float:
+    """Semantic similarity with embedding fallback to Jaccard.
+
+    Pass a precomputed `similarity` to skip the encoder.
+    """
+    llm, actual = analyze_text(llm_response), analyze_text(actual_response)
+    if not llm.text or not actual.text:
+        return 0.0
+    
+    if similarity is None:
+        similarity = calculate_semantic_similarity(llm, actual)
+    if similarity is not None:
+        return similarity
     
     # Fallback Jaccard similarity
-    words_a = set(re.findall(r'\w+', llm_response.lower()))
-    words_b = set(re.findall(r'\w+', actual_response.lower()))
+    words_a = llm.word_set
+    words_b = actual.word_set
     if not words_a or not words_b:
         return 0.0
     return len(words_a & words_b) / len(words_a | words_b)
 
-def calculate_accuracy(llm_response: str, actual_response: str) -> float:
+def calculate_accuracy(llm_response: TextInput, actual_response: TextInput) -> float:
     """F1-based keyword overlap (ignores stopwords)."""
-    if not llm_response or not actual_response:
+    llm, actual = analyze_text(llm_response), analyze_text(actual_response)
+    if not llm.text or not actual.text:
         return 0.0
     
-    words_a = set(re.findall(r'\w+', llm_response.lower())) - STOP_WORDS
-    words_b = set(re.findall(r'\w+', actual_response.lower())) - STOP_WORDS
+    words_a = llm.content_words
+    words_b = actual.content_words
     
     if not words_b:
         return 1.0 if not words_a else 0.0
@@ -55,21 +471,17 @@ def calculate_accuracy(llm_response: str, actual_response: str) -> float:
     
     return (2 * precision * recall / (precision + recall)) if (precision + recall) else 0.0
 
-def calculate_coherence(llm_response: str) -> float:
+def calculate_coherence(llm_response: TextInput) -> float:
     """Readability + sentence length balance."""
-    if not llm_response:
+    llm = analyze_text(llm_response)
+    if not llm.text:
         return 0.0
     
-    sentences = sent_tokenize(llm_response)
-    if not sentences:
+    if not llm.sentences:
         return 0.0
     
-    avg_len = np.mean([len(s.split()) for s in sentences])
-    try:
-        flesch_score = flesch_reading_ease(llm_response)
-        flesch_norm = max(0, min(1, flesch_score / 100))
-    except:
-        flesch_norm = 0.5
+    avg_len = np.mean(llm.sentence_lengths)
+    flesch_norm = llm.readability
     
     length_score = 1.0
     if avg_len < 5:
@@ -79,67 +491,74 @@ def calculate_coherence(llm_response: str) -> float:
     
     return min(1.0, max(0.0, (flesch_norm + length_score) / 2))
 
-def calculate_completeness(llm_response: str, actual_response: str) -> float:
+def calculate_completeness(llm_response: TextInput, actual_response: TextInput) -> float:
     """Coverage of key concepts + length ratio."""
-    if not actual_response:
-        return 1.0 if llm_response else 0.0
+    llm, actual = analyze_text(llm_response), analyze_text(actual_response)
+    if not actual.text:
+        return 1.0 if llm.text else 0.0
     
-    actual_concepts = set(re.findall(r'\w+', actual_response.lower())) - STOP_WORDS
-    llm_concepts = set(re.findall(r'\w+', llm_response.lower())) - STOP_WORDS
+    actual_concepts = actual.content_words
+    llm_concepts = llm.content_words
     
     if not actual_concepts:
-        return 1.0 if llm_response else 0.0
+        return 1.0 if llm.text else 0.0
     
     coverage = len(actual_concepts & llm_concepts) / len(actual_concepts)
-    length_ratio = min(1.0, len(llm_response) / max(len(actual_response), 1))
+    length_ratio = min(1.0, len(llm.text) / max(len(actual.text), 1))
     
     return (coverage + length_ratio) / 2
 
-def calculate_creativity(llm_response: str, actual_response: str) -> float:
-    """Lexical diversity + sentence variety − similarity penalty."""
-    if not llm_response:
+def calculate_creativity(llm_response: TextInput, actual_response: TextInput, relevance: Optional[float] = None) -> float:
+    """Lexical diversity + sentence variety − similarity penalty.
+
+    Pass the already computed `relevance` score to avoid recomputing it.
+    """
+    llm, actual = analyze_text(llm_response), analyze_text(actual_response)
+    if not llm.text:
         return 0.0
     
-    words = re.findall(r'\w+', llm_response.lower())
+    words = llm.words
     if not words:
         return 0.0
     
-    diversity = len(set(words)) / len(words)
+    diversity = len(llm.word_set) / len(words)
     
-    sentences = sent_tokenize(llm_response)
-    if len(sentences) > 1:
-        sentence_lengths = [len(s.split()) for s in sentences]
+    if len(llm.sentences) > 1:
+        sentence_lengths = llm.sentence_lengths
         variety = 1.0 - (np.std(sentence_lengths) / np.mean(sentence_lengths)) if np.mean(sentence_lengths) > 0 else 0.0
     else:
         variety = 0.5
     
     # Penalize if too similar to actual_response
     similarity_penalty = 0.0
-    if actual_response:
-        similarity_penalty = calculate_relevance(llm_response, actual_response) * 0.3
+    if actual.text:
+        if relevance is None:
+            relevance = calculate_relevance(llm, actual)
+        similarity_penalty = relevance * 0.3
     
     return min(1.0, max(0.0, (diversity + variety) / 2 - similarity_penalty))
 
-def calculate_tone(llm_response: str) -> float:
+def calculate_tone(llm_response: TextInput) -> float:
     """Structural consistency & professionalism."""
-    if not llm_response:
+    llm = analyze_text(llm_response)
+    if not llm.text:
         return 0.0
     
-    sentences = sent_tokenize(llm_response)
+    sentences = llm.sentences
     if not sentences:
         return 0.5
     
     proper_endings = sum(1 for s in sentences if s.strip().endswith(('.', '!', '?')))
     ending_consistency = proper_endings / len(sentences)
     
-    sentence_lengths = [len(s.split()) for s in sentences]
+    sentence_lengths = llm.sentence_lengths
     if len(sentence_lengths) > 1:
         length_balance = 1.0 - (np.std(sentence_lengths) / np.mean(sentence_lengths)) if np.mean(sentence_lengths) > 0 else 0.0
     else:
         length_balance = 0.8
     
-    exclamations = llm_response.count('!')
-    questions = llm_response.count('?')
+    exclamations = llm.text.count('!')
+    questions = llm.text.count('?')
     professionalism = 1.0
     if exclamations > len(sentences) * 0.3:
         professionalism = 0.7
@@ -148,23 +567,24 @@ def calculate_tone(llm_response: str) -> float:
     
     return min(1.0, max(0.0, (ending_consistency + length_balance + professionalism) / 3))
 
-def calculate_alignment_with_intent(llm_response: str, user_intent: str) -> float:
-    """Semantic similarity with fallback keyword match."""
-    if not user_intent:
+def calculate_alignment_with_intent(llm_response: TextInput, user_intent: TextInput, similarity: Optional[float] = None) -> float:
+    """Semantic similarity with fallback keyword match.
+
+    Pass a precomputed `similarity` to skip the encoder.
+    """
+    llm, intent = analyze_text(llm_response), analyze_text(user_intent)
+    if not intent.text:
         return 0.5
-    if not llm_response:
+    if not llm.text:
         return 0.0
     
-    if sentence_model:
-        try:
-            emb_a = sentence_model.encode([llm_response])
-            emb_b = sentence_model.encode([user_intent])
-            return float(cosine_similarity(emb_a, emb_b)[0][0])
-        except:
-            pass
+    if similarity is None:
+        similarity = calculate_semantic_similarity(llm, intent)
+    if similarity is not None:
+        return similarity
     
-    intent_words = set(re.findall(r'\w+', user_intent.lower())) - STOP_WORDS
-    response_words = set(re.findall(r'\w+', llm_response.lower())) - STOP_WORDS
+    intent_words = intent.content_words
+    response_words = llm.content_words
     
     if not intent_words:
         return 0.5
@@ -0,0 +1,132 @@
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import List, NamedTuple
+from core.config import Config
+
+# Flesch reading ease constants for English, as used by textstat
+FRE_BASE = 206.835
+FRE_SENTENCE_LENGTH = 1.015
+FRE_SYLLABLES_PER_WORD = 84.6
+
+# Abbreviations that never end a sentence (lowercase, without the final period)
+TITLES = frozenset({"mr", "mrs", "ms", "dr", "prof", "st", "mt", "vs", "cf", "e.g", "i.e", "fig", "vol", "pp"})
+# Abbreviations that may end a sentence; they only continue one before a lowercase word or a number
+ABBREVIATIONS = frozenset({
+    "sr", "jr", "etc", "inc", "ltd", "corp", "dept", "approx", "ave",
+    "jan", "feb", "apr", "jun", "jul", "aug", "sept", "oct", "nov", "dec",
+    "u.s", "u.k", "a.m", "p.m",
+})
+# Common words that open a sentence, so a capitalized one after an initial ("Plan B. Then") starts a new sentence
+SENTENCE_STARTERS = frozenset({
+    "a", "an", "the", "this", "that", "these", "those", "it", "its", "i", "we", "you", "he", "she", "they",
+    "there", "here", "and", "but", "or", "so", "then", "if", "when", "while", "what", "why", "how", "in",
+    "on", "at", "for", "to", "with", "as", "also", "however", "finally", "first", "next", "now", "yes", "no",
+})
+
+# A possible sentence end: ., ! or ? (plus closing quotes or brackets) followed by whitespace or the end
+_SENTENCE_END = re.compile(r"[.!?]+['\")\]]*(?=\s|\Z)")
+# The token after a possible sentence end
+_NEXT_TOKEN = re.compile(r"\s*(\S+)")
+# Sentences as textstat counts them for the reading ease: text up to each run of ., ! or ?
+_READABILITY_SENTENCE = re.compile(r"\b[^.!?]+[.!?]*")
+# Punctuation removed before counting words and syllables (hyphens join; only apostrophes inside words stay)
+_NON_WORD = re.compile(r"[^\w\s']|(?<!\w)'|'(?!\w)")
+
+
+class TextStats(NamedTuple):
+    """Sentence and readability statistics of a text, computed together by compute_text_stats."""
+    sentences: List[str]
+    sentence_lengths: List[int]
+    word_count: int
+    syllable_count: int
+    reading_ease: float
+
+
+@lru_cache(maxsize=Config.TEXT_STATS_SYLLABLE_CACHE_SIZE)
+def count_syllables(word: str) -> int:
+    """Syllables of a lowercase word, memoized (CMU dictionary, then Pyphen, via textstat)."""
+    from textstat import syllable_count
+    return syllable_count(word)
+
+
+def _is_initial(token: str) -> bool:
+    return len(token) == 2 and token[0].isupper() and token[1] == "."
+
+
+def _continues(text: str, start: int, end: int) -> bool:
+    # Whether the period ending text[start:end] belongs to an abbreviation
+    # ("Dr.", "e.g.") or an initial ("J.") rather than ending the sentence
+    tokens = text[start:end].rsplit(None, 2)
+    if not tokens:
+        return False
+    last = tokens[-1].strip("'\"()[]")
+    if not last.endswith(".") or last.endswith(".."):
+        return False
+    stem = last[:-1].lower()
+    if stem in TITLES:
+        return True
+    following = _NEXT_TOKEN.match(text, end)
+    if not following:
+        return False
+    following = following.group(1).lstrip("'\"([")
+    if not following:
+        return False
+    if stem == "no":
+        # "No. 5", but not "I said no. It was final."
+        return following[0].isdigit()
+    if stem in ABBREVIATIONS:
+        return not following[0].isupper()
+    if _is_initial(last):
+        # Inside a name: "J. R. R. Tolkien", "John F. Kennedy", "J. Smith"
+        if _is_initial(following):
+            return True
+        if not following[0].isupper() or following.rstrip(".,;:!?").lower() in SENTENCE_STARTERS:
+            return False
+        previous = tokens[-2] if len(tokens) > 1 else ""
+        return not previous or previous[0].isupper()
+    return False
+
+
+def compute_text_stats(text: str) -> TextStats:
+    """
+    Split `text` into sentences and count its words and syllables
+
+    Sentences end at ., ! or ? (plus closing quotes or brackets) followed by
+    whitespace, unless the period belongs to an abbreviation or to an initial
+    inside a name (see _continues).
+    Sentence lengths count whitespace-separated tokens, as the NLTK path
+    does. The Flesch reading ease follows textstat: its sentences end at
+    every run of ., ! or ? and only count with more than two words, words
+    are tokens with punctuation removed, and syllables are looked up once
+    per distinct word.
+    """
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        if match.end() < len(text) and _continues(text, start, match.end()):
+            continue
+        sentence = text[start:match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+    if text[start:].strip():
+        sentences.append(text[start:].strip())
+    sentence_lengths = [len(sentence.split()) for sentence in sentences]
+    # Short pieces only count with more than two words once punctuation is removed
+    counted_sentences = sum(
+        1 for piece in _READABILITY_SENTENCE.findall(text)
+        if len(piece.split()) > 3 or len(_NON_WORD.sub("", piece).split()) > 2
+    )
+
+    words = _NON_WORD.sub("", text.lower()).split()
+    syllables = sum(count * count_syllables(word) for word, count in Counter(words).items())
+    if not words or not syllables:
+        reading_ease = 0.0
+    else:
+        reading_ease = (
+            FRE_BASE
+            - FRE_SENTENCE_LENGTH * len(words) / max(1, counted_sentences)
+            - FRE_SYLLABLES_PER_WORD * syllables / len(words)
+        )
+    return TextStats(sentences, sentence_lengths, len(words), syllables, reading_ease)
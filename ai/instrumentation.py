@@ -0,0 +1,191 @@
+import bisect
+import cProfile
+import io
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Callables that receive the timings dict of every instrumented evaluation and batch
+_metrics_hooks: List[Callable[[dict], None]] = []
+_metrics_hooks_lock = threading.Lock()
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def add_metrics_hook(hook: Callable[[dict], None]) -> None:
+    """Call `hook(timings)` after every evaluate_response and evaluate_batch; registering one turns timing on.
+
+    Batch timings cover the whole batch and carry the number of `pairs`.
+    """
+    with _metrics_hooks_lock:
+        _metrics_hooks.append(hook)
+
+
+def remove_metrics_hook(hook: Callable[[dict], None]) -> None:
+    with _metrics_hooks_lock:
+        if hook in _metrics_hooks:
+            _metrics_hooks.remove(hook)
+
+
+def has_metrics_hooks() -> bool:
+    return bool(_metrics_hooks)
+
+
+def emit_timings(timings: dict) -> None:
+    with _metrics_hooks_lock:
+        hooks = list(_metrics_hooks)
+    for hook in hooks:
+        hook(timings)
+
+
+@contextmanager
+def timed(timings: Optional[dict], key: str) -> Iterator[None]:
+    """Add the wall time of the block to `timings[key]` (no-op when timings is None)."""
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[key] = timings.get(key, 0.0) + time.perf_counter() - started
+
+
+@contextmanager
+def profiled(profiler: Optional[str]) -> Iterator[dict]:
+    """Profile the block with "cprofile" or "pyinstrument" (None does nothing).
+
+    Yields a dict whose "report" key holds the text report once the block exits.
+    """
+    result = {"profiler": profiler, "report": None}
+    if profiler is None:
+        yield result
+    elif profiler == "cprofile":
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield result
+        finally:
+            profile.disable()
+            report = io.StringIO()
+            pstats.Stats(profile, stream=report).sort_stats("cumulative").print_stats(30)
+            result["report"] = report.getvalue()
+    elif profiler == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError as e:
+            raise ImportError("pyinstrument is not installed; use profile='cprofile' or pip install pyinstrument") from e
+        profile = Profiler()
+        profile.start()
+        try:
+            yield result
+        finally:
+            profile.stop()
+            result["report"] = profile.output_text()
+    else:
+        raise ValueError(f"Unknown profiler {profiler!r}; expected 'cprofile' or 'pyinstrument'")
+
+
+class Counter:
+    """Monotonic counter with optional labels."""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self.values: Dict[Tuple[Tuple[str, str], ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(labels)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels."""
+
+    def __init__(self, name: str, description: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self.values: Dict[Tuple[Tuple[str, str], ...], dict] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        series = self.values.setdefault(key, {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series["buckets"][index] += 1
+        series["sum"] += value
+        series["count"] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series["buckets"]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {series['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {series['sum']}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {series['count']}")
+        return lines
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels) + "}"
+
+
+class PrometheusMetrics:
+    """In-process counters and histograms fed by evaluation timings.
+
+    Needs no server or client library: register `observe` as a metrics hook
+    and call `render()` for the Prometheus text exposition format, e.g. to
+    serve it from an existing endpoint or write it for node_exporter's
+    textfile collector.
+
+        metrics = PrometheusMetrics()
+        add_metrics_hook(metrics.observe)
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self._lock = threading.Lock()
+        self.evaluations = Counter("llm_eval_evaluations_total", "Instrumented evaluations, counting each pair of a batch")
+        self.embedding_cache = Counter("llm_eval_embedding_cache_total", "Embedding cache lookups by result")
+        self.text_chars = Counter("llm_eval_text_chars_total", "Characters evaluated by side")
+        self.duration = Histogram("llm_eval_evaluation_seconds", "Wall time of evaluate_response", buckets)
+        self.step_duration = Histogram("llm_eval_step_seconds", "Wall time of shared preprocessing steps", buckets)
+        self.criterion_duration = Histogram("llm_eval_criterion_seconds", "Wall time of each criterion", buckets)
+        self.batch_duration = Histogram("llm_eval_batch_seconds", "Wall time of evaluate_batch", buckets)
+        self.batch_step_duration = Histogram("llm_eval_batch_step_seconds", "Wall time of each evaluate_batch stage", buckets)
+        self.batch_criterion_duration = Histogram("llm_eval_batch_criterion_seconds", "Wall time of each criterion over a batch", buckets)
+
+    def observe(self, timings: dict) -> None:
+        batch = "pairs" in timings
+        with self._lock:
+            self.evaluations.inc(timings.get("pairs", 1))
+            (self.batch_duration if batch else self.duration).observe(timings["total_s"])
+            for step, seconds in timings["steps"].items():
+                (self.batch_step_duration if batch else self.step_duration).observe(seconds, step=step)
+            for criterion, seconds in timings["criteria"].items():
+                (self.batch_criterion_duration if batch else self.criterion_duration).observe(seconds, criterion=criterion)
+            for result, count in (timings["embedding_cache"] or {}).items():
+                self.embedding_cache.inc(count, result=result)
+            for side, sizes in timings["text_sizes"].items():
+                self.text_chars.inc(sizes["chars"], side=side)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = [
+                self.evaluations, self.embedding_cache, self.text_chars, self.duration, self.step_duration, self.criterion_duration,
+                self.batch_duration, self.batch_step_duration, self.batch_criterion_duration
+            ]
+            return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
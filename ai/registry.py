@@ -0,0 +1,141 @@
+from typing import Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple, Union
+from models.enums import EvaluationCriteria
+from ai.evaluator_utils import TextAnalysis, calculate_relevance, calculate_accuracy, calculate_coherence, calculate_completeness, calculate_creativity, calculate_tone, calculate_alignment_with_intent
+
+# Shared artifacts a metric can require. "embedding" means the pair's cosine
+# similarity, the only artifact that needs the encoder.
+EMBEDDING = "embedding"
+WORDS = "words"
+CONTENT_WORDS = "content_words"
+SENTENCES = "sentences"
+READABILITY = "readability"
+
+# Relative cost of a metric, dominated by its most expensive artifact
+COST_LEXICAL = 1
+COST_SENTENCES = 2
+COST_ENCODER = 3
+
+CriterionInput = Union[EvaluationCriteria, str]
+
+
+class MetricSpec(NamedTuple):
+    """How one criterion is scored.
+
+    `func(llm, actual, similarity, scores)` returns the score; `similarity` is
+    None when no embedding was computed, and `scores` holds the criteria
+    scored before it, which includes everything listed in `depends_on`.
+    """
+    criterion: EvaluationCriteria
+    func: Callable[[TextAnalysis, TextAnalysis, Optional[float], Dict[str, float]], float]
+    requires: FrozenSet[str]
+    cost: int
+    depends_on: Tuple[EvaluationCriteria, ...] = ()
+
+
+_metrics: Dict[EvaluationCriteria, MetricSpec] = {}
+
+
+def uses_default_metrics() -> bool:
+    """True while the registry holds exactly the built-in metrics, in their original order."""
+    return tuple(_metrics.values()) == _DEFAULT_METRICS
+
+
+def register_metric(spec: MetricSpec) -> None:
+    """Add or replace the metric for `spec.criterion`; registration order is scoring order."""
+    _metrics[spec.criterion] = spec
+
+
+def get_metric(criterion: CriterionInput) -> MetricSpec:
+    return _metrics[EvaluationCriteria(criterion)]
+
+
+def list_metrics(max_cost: Optional[int] = None) -> List[MetricSpec]:
+    """Registered metrics in scoring order, optionally only those costing at most `max_cost`."""
+    return [spec for spec in _metrics.values() if max_cost is None or spec.cost <= max_cost]
+
+
+def resolve_metrics(criteria: Optional[Iterable[CriterionInput]] = None) -> List[MetricSpec]:
+    """
+    Metrics to run for `criteria` (all registered ones when None)
+
+    Dependencies are added and everything is returned in scoring order, so a
+    metric always runs after the ones it depends on.
+
+    Raises:
+        ValueError: for names that are not criteria
+    """
+    if criteria is None:
+        return list(_metrics.values())
+    pending = [EvaluationCriteria(criterion) for criterion in criteria]
+    needed = set()
+    while pending:
+        criterion = pending.pop()
+        if criterion not in needed:
+            needed.add(criterion)
+            pending.extend(_metrics[criterion].depends_on)
+    return [spec for criterion, spec in _metrics.items() if criterion in needed]
+
+
+def required_artifacts(specs: Iterable[MetricSpec]) -> FrozenSet[str]:
+    return frozenset().union(*(spec.requires for spec in specs))
+
+
+# Relevance: Semantic similarity between LLM and actual response
+register_metric(MetricSpec(
+    EvaluationCriteria.RELEVANCE,
+    lambda llm, actual, similarity, scores: calculate_relevance(llm, actual, similarity=similarity),
+    requires=frozenset({EMBEDDING, WORDS}),
+    cost=COST_ENCODER
+))
+
+# Accuracy: Content accuracy and factual correctness
+register_metric(MetricSpec(
+    EvaluationCriteria.ACCURACY,
+    lambda llm, actual, similarity, scores: calculate_accuracy(llm, actual),
+    requires=frozenset({CONTENT_WORDS}),
+    cost=COST_LEXICAL
+))
+
+# Coherence: Logical flow and readability
+register_metric(MetricSpec(
+    EvaluationCriteria.COHERENCE,
+    lambda llm, actual, similarity, scores: calculate_coherence(llm),
+    requires=frozenset({SENTENCES, READABILITY}),
+    cost=COST_SENTENCES
+))
+
+# Completeness: Coverage of expected content
+register_metric(MetricSpec(
+    EvaluationCriteria.COMPLETENESS,
+    lambda llm, actual, similarity, scores: calculate_completeness(llm, actual),
+    requires=frozenset({CONTENT_WORDS}),
+    cost=COST_LEXICAL
+))
+
+# Creativity: Originality and unique expression
+register_metric(MetricSpec(
+    EvaluationCriteria.CREATIVITY,
+    lambda llm, actual, similarity, scores: calculate_creativity(llm, actual, relevance=scores[EvaluationCriteria.RELEVANCE.value]),
+    requires=frozenset({WORDS, SENTENCES}),
+    cost=COST_SENTENCES,
+    depends_on=(EvaluationCriteria.RELEVANCE,)
+))
+
+# Tone: Appropriateness and consistency
+register_metric(MetricSpec(
+    EvaluationCriteria.TONE,
+    lambda llm, actual, similarity, scores: calculate_tone(llm),
+    requires=frozenset({SENTENCES}),
+    cost=COST_SENTENCES
+))
+
+# Alignment with intent: How well it matches user's intended purpose
+register_metric(MetricSpec(
+    EvaluationCriteria.ALIGNMENT_WITH_INTENT,
+    lambda llm, actual, similarity, scores: calculate_alignment_with_intent(llm, actual, similarity=similarity),
+    requires=frozenset({EMBEDDING, CONTENT_WORDS}),
+    cost=COST_ENCODER
+))
+
+# Process pool workers import this module afresh, so they only see these
+_DEFAULT_METRICS = tuple(_metrics.values())
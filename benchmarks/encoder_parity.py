@@ -0,0 +1,147 @@
+"""
+Score parity, latency and memory of the encoder backends.
+
+Usage:
+    python -m benchmarks.encoder_parity --backend onnx_int8
+    python -m benchmarks.encoder_parity --backend onnx --backend torch_int8 --corpus records.jsonl --output parity.json
+
+Every backend encodes the same texts (samples.md, an optional JSONL corpus and
+synthetic long and short texts) in its own process, which reports the encode
+latency and peak RSS. The pairs are then scored with each backend's
+embeddings and compared with the fp32 torch scores. Exits with status 1 when
+any criterion or the overall score moves by more than
+Config.ENCODER_PARITY_TOLERANCE (or --tolerance).
+"""
+import argparse
+import json
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.run import TextGenerator, load_corpus, load_samples
+
+
+def encode_in_process(backend: str, texts: List[str], repeat: int) -> dict:
+    """Load `backend`, encode `texts` `repeat` times; runs in a fresh process."""
+    from core.config import Config
+    from ai.evaluator_utils import load_sentence_model
+
+    started = time.perf_counter()
+    model = load_sentence_model(backend)
+    load_s = time.perf_counter() - started
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        vectors = model.encode(texts, batch_size=Config.EMBEDDING_BATCH_SIZE, normalize_embeddings=True, show_progress_bar=False)
+        timings.append(time.perf_counter() - started)
+
+    return {
+        "backend": backend,
+        "load_s": load_s,
+        "encode_median_s": statistics.median(timings),
+        "encode_min_s": min(timings),
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "vectors": np.asarray(vectors, dtype=np.float32),
+    }
+
+
+class PrecomputedEncoder:
+    """Stands in for a SentenceTransformer, returning embeddings computed elsewhere."""
+
+    def __init__(self, texts: List[str], vectors: np.ndarray):
+        self.vectors = dict(zip(texts, vectors))
+
+    def encode(self, texts: List[str], **kwargs) -> np.ndarray:
+        return np.stack([self.vectors[text] for text in texts])
+
+
+def score_with(encoder: PrecomputedEncoder, pairs: List[tuple]):
+    from ai import evaluator_utils
+    from ai.evaluator import evaluate_batch
+
+    saved = evaluator_utils._sentence_model, evaluator_utils._sentence_model_loaded
+    evaluator_utils._sentence_model, evaluator_utils._sentence_model_loaded = encoder, True
+    try:
+        return evaluate_batch(pairs, workers=0)
+    finally:
+        evaluator_utils._sentence_model, evaluator_utils._sentence_model_loaded = saved
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare encoder backends against fp32 torch")
+    parser.add_argument("--backend", action="append", help="Backend to check (repeatable; default: Config.ENCODER_BACKEND)")
+    parser.add_argument("--corpus", help="JSONL file of llm_response/actual_response records to score besides samples.md")
+    parser.add_argument("--tolerance", type=float, help="Largest accepted score change (default: Config.ENCODER_PARITY_TOLERANCE)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed encodes per backend (default: 3)")
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    from core.config import Config
+    from ai.evaluator_utils import analyze_text
+
+    # Embeddings must come from the backends under test, not from the cache
+    Config.EMBEDDING_CACHE_ENABLED = False
+    tolerance = args.tolerance if args.tolerance is not None else Config.ENCODER_PARITY_TOLERANCE
+    backends = [backend for backend in (args.backend or [Config.ENCODER_BACKEND]) if backend != "torch"]
+    if not backends:
+        parser.error("choose a backend other than torch to compare against it")
+
+    pairs = load_samples()
+    if args.corpus:
+        pairs += load_corpus(args.corpus)
+    generator = TextGenerator([text for pair in pairs for text in pair])
+    pairs += [generator.pair(words) for words in (30, 120, 600, 2000)]
+
+    # The exact texts the evaluator will encode, long inputs split into chunks
+    texts = list(dict.fromkeys(chunk for pair in pairs for text in pair if text for chunk in analyze_text(text).chunks))
+
+    context = multiprocessing.get_context("spawn")
+    runs: Dict[str, dict] = {}
+    for backend in ["torch"] + backends:
+        with context.Pool(1) as pool:
+            runs[backend] = pool.apply(encode_in_process, (backend, texts, args.repeat))
+        print(f"{backend}: encoded {len(texts)} texts in {runs[backend]['encode_median_s']:.3f}s", file=sys.stderr)
+
+    reference = score_with(PrecomputedEncoder(texts, runs["torch"]["vectors"]), pairs)
+    report = {"tolerance": tolerance, "pairs": len(pairs), "texts": len(texts), "backends": []}
+    passed = True
+    for backend in ["torch"] + backends:
+        run = runs[backend]
+        entry = {key: run[key] for key in ("backend", "load_s", "encode_median_s", "encode_min_s", "peak_rss_mb")}
+        if backend != "torch":
+            scores = score_with(PrecomputedEncoder(texts, run["vectors"]), pairs)
+            drift = (scores - reference).abs().max()
+            entry["max_score_drift"] = {column: float(value) for column, value in drift.items()}
+            entry["embedding_cosine_min"] = float(np.min(np.einsum("ij,ij->i", run["vectors"], runs["torch"]["vectors"])))
+            entry["encode_speedup"] = runs["torch"]["encode_median_s"] / run["encode_median_s"]
+            entry["rss_ratio"] = run["peak_rss_mb"] / runs["torch"]["peak_rss_mb"]
+            entry["within_tolerance"] = bool(drift.max() <= tolerance)
+            passed = passed and entry["within_tolerance"]
+        report["backends"].append(entry)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    for entry in report["backends"][1:]:
+        status = "OK" if entry["within_tolerance"] else "FAIL"
+        print(
+            f"{status} {entry['backend']}: max drift {max(entry['max_score_drift'].values()):.4f} (tolerance {tolerance}), "
+            f"encode {entry['encode_speedup']:.2f}x faster, peak RSS {entry['rss_ratio']:.2f}x of torch",
+            file=sys.stderr
+        )
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+"""
+Benchmarks for the evaluator and repository hot paths.
+
+Usage:
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --suite evaluator --corpus records.jsonl --output results.json
+    python -m benchmarks.run --suite repository --rows 1000,100000 --compare baseline.json
+
+Evaluator benchmarks time every calculate_* function at several text lengths
+and evaluate_response with and without the sentence model. Texts come from
+samples.md, an optional JSONL corpus (`llm_response` / `actual_response`
+fields, as read by cli.py) and a seeded synthetic generator, so two runs on the
+same machine time the same inputs.
+
+Repository benchmarks run against a scratch SQLite database (or
+--database-url) that is filled with synthetic rows up to each --rows size in
+turn, and time create_evaluation inserts and get_evaluations_paginated with
+each filter.
+
+Results are written as JSON; --compare prints the change against an earlier
+results file.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TEXT_LENGTHS = [50, 200, 1000, 5000]
+ROW_COUNTS = [1_000, 100_000, 1_000_000]
+INSERT_COUNT = 200
+SEED = 42
+
+_SAMPLE_RESPONSE = re.compile(r'\*\*(Actual/Ideal|LLM) Response:\*\*\s*\*"(.*?)"\*', re.S)
+
+
+def load_samples(path: str = os.path.join(ROOT, "samples.md")) -> List[Tuple[str, str]]:
+    """(llm_response, actual_response) pairs from samples.md."""
+    pairs = []
+    with open(path, encoding="utf-8") as f:
+        for block in f.read().split("---"):
+            responses = dict(_SAMPLE_RESPONSE.findall(block))
+            if "LLM" in responses and "Actual/Ideal" in responses:
+                pairs.append((responses["LLM"], responses["Actual/Ideal"]))
+    return pairs
+
+
+def load_corpus(path: str, limit: int = 1000) -> List[Tuple[str, str]]:
+    """Up to `limit` (llm_response, actual_response) pairs from a JSONL file."""
+    pairs = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if len(pairs) >= limit:
+                break
+            if line.strip():
+                record = json.loads(line)
+                pairs.append((record.get("llm_response") or "", record.get("actual_response") or ""))
+    return pairs
+
+
+class TextGenerator:
+    """Seeded generator of sentence-shaped text built from a sample vocabulary."""
+
+    def __init__(self, texts: List[str], seed: int = SEED):
+        self.random = random.Random(seed)
+        self.vocabulary = sorted({word.lower() for text in texts for word in re.findall(r"[A-Za-z]+", text)})
+
+    def text(self, words: int) -> str:
+        sentences = []
+        remaining = words
+        while remaining > 0:
+            length = min(remaining, self.random.randint(5, 25))
+            sentence = " ".join(self.random.choice(self.vocabulary) for _ in range(length))
+            sentences.append(sentence.capitalize() + self.random.choice(".....!?"))
+            remaining -= length
+        return " ".join(sentences)
+
+    def pair(self, words: int) -> Tuple[str, str]:
+        return self.text(words), self.text(words)
+
+
+def time_call(func: Callable, repeat: int, number: int = 1) -> dict:
+    """Run `func` `number` times per repeat and summarize seconds per call."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - started) / number)
+    return {
+        "repeat": repeat,
+        "number": number,
+        "min_s": min(timings),
+        "median_s": statistics.median(timings),
+        "mean_s": statistics.fmean(timings),
+        "max_s": max(timings),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=ROOT, text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@contextmanager
+def without_sentence_model():
+    """Make the evaluator behave as if the sentence model could not be loaded."""
+    from ai import evaluator_utils
+    saved = evaluator_utils._sentence_model, evaluator_utils._sentence_model_loaded
+    evaluator_utils._sentence_model, evaluator_utils._sentence_model_loaded = None, True
+    try:
+        yield
+    finally:
+        evaluator_utils._sentence_model, evaluator_utils._sentence_model_loaded = saved
+
+
+def run_evaluator_benchmarks(pairs: List[Tuple[str, str]], generator: TextGenerator, repeat: int) -> List[dict]:
+    from ai import evaluator_utils
+    from ai.evaluator import evaluate_response
+
+    evaluator_utils.warm_up()
+    model_loaded = evaluator_utils.get_sentence_model() is not None
+    results = []
+
+    single = {
+        "calculate_coherence": evaluator_utils.calculate_coherence,
+        "calculate_tone": evaluator_utils.calculate_tone,
+    }
+    paired = {
+        "calculate_semantic_similarity": evaluator_utils.calculate_semantic_similarity,
+        "calculate_relevance": evaluator_utils.calculate_relevance,
+        "calculate_accuracy": evaluator_utils.calculate_accuracy,
+        "calculate_completeness": evaluator_utils.calculate_completeness,
+        "calculate_creativity": evaluator_utils.calculate_creativity,
+        "calculate_alignment_with_intent": evaluator_utils.calculate_alignment_with_intent,
+    }
+    for words in TEXT_LENGTHS:
+        llm_response, actual_response = generator.pair(words)
+        for name, func in single.items():
+            results.append({"name": name, "params": {"words": words}, **time_call(lambda: func(llm_response), repeat)})
+        for name, func in paired.items():
+            results.append({"name": name, "params": {"words": words}, **time_call(lambda: func(llm_response, actual_response), repeat)})
+        print(f"calculate_* at {words} words done", file=sys.stderr)
+
+    def evaluate_all():
+        for llm_response, actual_response in pairs:
+            evaluate_response(llm_response, actual_response)
+
+    variants = [("with_model", nullcontext()), ("without_model", without_sentence_model())]
+    for variant, context in variants:
+        if variant == "with_model" and not model_loaded:
+            print("sentence model unavailable, skipping evaluate_response with_model", file=sys.stderr)
+            continue
+        with context:
+            timing = time_call(evaluate_all, repeat)
+        results.append({
+            "name": "evaluate_response",
+            "params": {"sentence_model": variant == "with_model", "pairs": len(pairs)},
+            **timing,
+            "per_pair_s": timing["median_s"] / max(len(pairs), 1),
+        })
+    print("evaluate_response done", file=sys.stderr)
+    return results
+
+
+def _synthetic_rows(generator: TextGenerator, count: int, now: datetime) -> List[dict]:
+    from core.config import Config
+    rows = []
+    for _ in range(count):
+        scores = {criterion.value: generator.random.random() for criterion in Config.EVALUATION_CRITERIA_LIST}
+        rows.append({
+            "llm_response": generator.text(generator.random.randint(20, 80)),
+            "actual_response": generator.text(generator.random.randint(20, 80)),
+            "scores": scores,
+            "overall_score": sum(scores[criterion.value] * weight for criterion, weight in Config.EVALUATION_CRITERIA_WEIGHTS.items()),
+            "notes": None,
+            "created_at": now - timedelta(seconds=generator.random.randint(0, 365 * 24 * 3600)),
+        })
+    return rows
+
+
+def fill_evaluations(generator: TextGenerator, target: int, chunk_size: int = 10_000) -> int:
+    """Insert synthetic rows spread over the past year until the table holds `target` rows."""
+    from repositories.evaluation import create_evaluations_bulk, get_evaluations_count
+
+    now = datetime.utcnow()
+    existing = get_evaluations_count()
+    while existing < target:
+        existing += create_evaluations_bulk(_synthetic_rows(generator, min(chunk_size, target - existing), now))
+    return existing
+
+
+def run_repository_benchmarks(generator: TextGenerator, row_counts: List[int], repeat: int) -> List[dict]:
+    from core.config import Config
+    from core.database import init_db
+    from repositories.evaluation import create_evaluation, get_evaluations_paginated
+
+    init_db()
+    results = []
+
+    llm_response, actual_response = generator.pair(60)
+    scores = {criterion.value: 0.5 for criterion in Config.EVALUATION_CRITERIA_LIST}
+    timing = time_call(lambda: create_evaluation(llm_response, actual_response, scores, 0.5), repeat=1, number=INSERT_COUNT)
+    results.append({"name": "create_evaluation", "params": {"inserts": INSERT_COUNT}, **timing, "rows_per_s": 1 / timing["median_s"]})
+    print("create_evaluation done", file=sys.stderr)
+
+    for rows in row_counts:
+        fill_evaluations(generator, rows)
+        day = (datetime.utcnow() - timedelta(days=30)).strftime("%Y-%m-%d")
+        search_term = generator.random.choice(generator.vocabulary)
+        filters = {
+            "none": {},
+            "date": {"date_filter": day},
+            "score": {"score_filter": 0.7},
+            "search": {"search_term": search_term},
+            "all": {"date_filter": day, "score_filter": 0.3, "search_term": search_term},
+        }
+        for filter_name, kwargs in filters.items():
+            for page in (1, 50):
+                timing = time_call(lambda: get_evaluations_paginated(page=page, page_size=10, **kwargs), repeat)
+                results.append({
+                    "name": "get_evaluations_paginated",
+                    "params": {"rows": rows, "filter": filter_name, "page": page},
+                    **timing,
+                })
+        print(f"get_evaluations_paginated at {rows} rows done", file=sys.stderr)
+    return results
+
+
+def compare(results: List[dict], baseline_path: str) -> None:
+    """Print the median change of every benchmark also present in `baseline_path`."""
+    with open(baseline_path) as f:
+        baseline = {
+            (result["name"], json.dumps(result["params"], sort_keys=True)): result
+            for result in json.load(f)["results"]
+        }
+    for result in results:
+        before = baseline.get((result["name"], json.dumps(result["params"], sort_keys=True)))
+        if before:
+            change = result["median_s"] / before["median_s"] - 1 if before["median_s"] else 0.0
+            print(f"{result['name']:<34} {json.dumps(result['params']):<60} {before['median_s'] * 1000:10.3f} ms -> {result['median_s'] * 1000:10.3f} ms  {change:+.1%}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the evaluator and repository hot paths")
+    parser.add_argument("--suite", choices=["all", "evaluator", "repository"], default="all")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    parser.add_argument("--corpus", help="JSONL file of llm_response/actual_response records to evaluate besides samples.md")
+    parser.add_argument("--rows", default=",".join(str(rows) for rows in ROW_COUNTS), help="Comma-separated table sizes for the repository suite")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per benchmark (default: 5)")
+    parser.add_argument("--database-url", help="Database for the repository suite (default: a scratch SQLite file)")
+    parser.add_argument("--embedding-cache", action="store_true", help="Keep the embedding cache on, timing cached rather than fresh encodes")
+    args = parser.parse_args(argv)
+
+    # Must be set before core.config is imported
+    scratch_dir = tempfile.mkdtemp(prefix="llm-eval-bench-")
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(scratch_dir, 'benchmark.db')}"
+    from core.config import Config
+    Config.EMBEDDING_CACHE_ENABLED = args.embedding_cache
+    Config.EMBEDDING_CACHE_PATH = os.path.join(scratch_dir, "embedding_cache.db")
+
+    pairs = load_samples()
+    if args.corpus:
+        pairs += load_corpus(args.corpus)
+    generator = TextGenerator([text for pair in pairs for text in pair])
+
+    results = []
+    if args.suite in ("all", "evaluator"):
+        results += run_evaluator_benchmarks(pairs, generator, args.repeat)
+    if args.suite in ("all", "repository"):
+        row_counts = sorted(int(rows) for rows in args.rows.split(","))
+        results += run_repository_benchmarks(generator, row_counts, args.repeat)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "database": Config.DATABASE_URL.split("://")[0],
+            "embedding_cache": args.embedding_cache,
+            "seed": SEED,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+Speed and score parity of the text statistics engines.
+
+Usage:
+    python -m benchmarks.text_stats
+    python -m benchmarks.text_stats --corpus records.jsonl --output text_stats.json
+
+Sentence splitting, sentence lengths and readability are computed for the same
+texts (samples.md, an optional JSONL corpus, synthetic texts, sentences
+around abbreviations and initials, and a few punctuation edge cases) with the "nltk" engine (Punkt + textstat) and the
+"fast" engine (ai.fast_text). The report gives the time per text of each
+engine, cold (empty syllable memo) and warm, and the largest and mean change
+of the coherence, creativity and tone scores. Exits with status 1 when a score
+moves by more than Config.TEXT_STATS_TOLERANCE (or --tolerance) on any text
+but the edge cases, whose drift is reported separately: there the engines are
+expected to disagree about some sentence boundaries.
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.run import TextGenerator, load_corpus, load_samples
+
+# Short sentences ending in words that look like abbreviations or initials, and
+# names with titles and initials; both engines must split these alike
+PARITY_CASES = [
+    "I said no. It was final.",
+    "The answer is no. Move on.",
+    "Get vitamin C. Eat fruit.",
+    "We chose Option A. Then we left.",
+    "Dr. Smith said no. Then he left? Really!",
+    "Dr. Smith met Mr. Jones at 3 p.m. on Monday. They talked for an hour.",
+    "J. R. R. Tolkien wrote many books. Is that right? Yes, it is.",
+    "President John F. Kennedy spoke. People listened.",
+    "Apples, pears, etc. The rest were sold.",
+]
+
+# Decimals, quotes, ellipses and rarer abbreviations, where the engines can split differently
+EDGE_CASES = [
+    'She said "it works." Then she left... Nobody followed her!',
+    "The U.S. economy grew 2.5 percent, e.g. in services. Prices rose slightly.",
+    "Results (see Fig. 3) improved. The well-known effect isn't new.",
+    "See No. 5 on the list. It works.",
+    "no punctuation at all in this response",
+]
+
+
+def time_engine(engine: str, texts: List[str], repeat: int) -> Dict[str, float]:
+    """Seconds per text to compute sentences, sentence lengths and readability."""
+    from core.config import Config
+    from ai.evaluator_utils import TextAnalysis, ensure_nltk_data
+    from ai.fast_text import count_syllables
+
+    Config.TEXT_STATS_ENGINE = engine
+    ensure_nltk_data()
+    count_syllables.cache_clear()
+    timings = []
+    for _ in range(repeat + 1):
+        started = time.perf_counter()
+        for text in texts:
+            analysis = TextAnalysis(text)
+            analysis.sentence_lengths, analysis.readability
+        timings.append((time.perf_counter() - started) / len(texts))
+    # The first round starts with an empty syllable memo
+    return {"cold_s": timings[0], "warm_median_s": statistics.median(timings[1:])}
+
+
+def score_engine(engine: str, pairs: List[Tuple[str, str]]) -> List[Dict[str, float]]:
+    from core.config import Config
+    from ai.evaluator_utils import analyze_text, calculate_coherence, calculate_creativity, calculate_tone
+
+    Config.TEXT_STATS_ENGINE = engine
+    scores = []
+    for llm_response, actual_response in pairs:
+        llm, actual = analyze_text(llm_response), analyze_text(actual_response)
+        # A fixed relevance keeps the encoder out of the comparison
+        scores.append({
+            "coherence": calculate_coherence(llm),
+            "creativity": calculate_creativity(llm, actual, relevance=0.5),
+            "tone": calculate_tone(llm),
+        })
+    return scores
+
+
+def score_drift(pairs: List[Tuple[str, str]]) -> Dict[str, List[float]]:
+    """Per-pair absolute score change from the nltk engine to the fast one, by criterion."""
+    reference, fast = score_engine("nltk", pairs), score_engine("fast", pairs)
+    return {
+        criterion: [float(abs(a[criterion] - b[criterion])) for a, b in zip(reference, fast)]
+        for criterion in reference[0]
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare the fast text statistics engine with NLTK + textstat")
+    parser.add_argument("--corpus", help="JSONL file of llm_response/actual_response records to use besides samples.md")
+    parser.add_argument("--tolerance", type=float, help="Largest accepted score change (default: Config.TEXT_STATS_TOLERANCE)")
+    parser.add_argument("--repeat", type=int, default=5, help="Warm timing rounds per engine (default: 5)")
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    from core.config import Config
+
+    tolerance = args.tolerance if args.tolerance is not None else Config.TEXT_STATS_TOLERANCE
+    pairs = load_samples()
+    if args.corpus:
+        pairs += load_corpus(args.corpus)
+    generator = TextGenerator([text for pair in pairs for text in pair])
+    pairs += [generator.pair(words) for words in (20, 50, 100, 200, 500, 1000) for _ in range(50)]
+    pairs += [(text, PARITY_CASES[0]) for text in PARITY_CASES]
+    edge_pairs = [(text, EDGE_CASES[0]) for text in EDGE_CASES]
+    # More texts than textstat's per-text cache holds, so repeats are not served from it
+    texts = list(dict.fromkeys(text for pair in pairs + edge_pairs for text in pair if text))
+
+    report = {"tolerance": tolerance, "pairs": len(pairs), "texts": len(texts), "engines": {}}
+    for engine in ("nltk", "fast"):
+        report["engines"][engine] = time_engine(engine, texts, args.repeat)
+        print(f"{engine}: {report['engines'][engine]['warm_median_s'] * 1e3:.3f} ms per text", file=sys.stderr)
+
+    drift = score_drift(pairs)
+    report["max_score_drift"] = {criterion: max(values) for criterion, values in drift.items()}
+    report["mean_score_drift"] = {criterion: statistics.fmean(values) for criterion, values in drift.items()}
+    report["edge_case_drift"] = {criterion: max(values) for criterion, values in score_drift(edge_pairs).items()}
+    report["speedup_warm"] = report["engines"]["nltk"]["warm_median_s"] / report["engines"]["fast"]["warm_median_s"]
+    report["speedup_cold"] = report["engines"]["nltk"]["cold_s"] / report["engines"]["fast"]["cold_s"]
+    max_drift = max(report["max_score_drift"].values())
+    report["within_tolerance"] = max_drift <= tolerance
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+    status = "OK" if report["within_tolerance"] else "FAIL"
+    print(
+        f"{status}: max drift {max_drift:.4f} (tolerance {tolerance}), "
+        f"fast engine {report['speedup_warm']:.2f}x faster warm, {report['speedup_cold']:.2f}x cold",
+        file=sys.stderr
+    )
+    return 0 if report["within_tolerance"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
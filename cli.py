@@ -0,0 +1,296 @@
+"""
+Headless evaluation runner.
+
+Usage:
+    python cli.py evaluate records.jsonl --output scores.jsonl
+    python cli.py evaluate records.jsonl --output scores.csv --no-db --checkpoint run.ckpt
+    python cli.py evaluate records.jsonl --output scores.jsonl --workers 4
+    python cli.py evaluate records.jsonl --output scores.csv --no-db --criteria accuracy,relevance
+    python cli.py rescore
+    python cli.py export history.parquet --columns created_at,overall_score --min-score 0.5
+    python cli.py import history.parquet
+
+Each input line is a JSON object with `llm_response`, `actual_response` and an
+optional `notes` field. Records are read as a stream and scored in fixed-size
+chunks, so memory stays flat regardless of file size.
+
+`rescore` recomputes the stored overall scores from the stored criterion
+scores after Config.EVALUATION_CRITERIA_WEIGHTS changes, without running the
+evaluator. `export`
+streams the evaluation history to a Parquet, Arrow or CSV file and `import`
+loads such a file back, both in chunks of Config.EXPORT_CHUNK_SIZE rows.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+
+from core.config import Config
+
+
+def output_columns(criteria: Optional[List[str]] = None) -> List[str]:
+    return (
+        ["llm_response", "actual_response", "notes"]
+        + [criterion.value for criterion in Config.EVALUATION_CRITERIA_LIST if not criteria or criterion.value in criteria]
+        + ["overall_score"]
+    )
+
+
+def read_records(path: str, offset: int = 0) -> Iterator[Tuple[dict, int]]:
+    """Yield (record, byte offset after the record) for each non-blank line, starting at `offset`."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while True:
+            line = f.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}: invalid JSON at byte {f.tell() - len(line)}: {e}") from e
+            if not isinstance(record, dict):
+                raise ValueError(f"{path}: expected a JSON object at byte {f.tell() - len(line)}, got {type(record).__name__}")
+            yield record, f.tell()
+
+
+def load_checkpoint(path: Optional[str], input_path: str) -> dict:
+    if not path or not os.path.exists(path):
+        return {"input": os.path.abspath(input_path), "offset": 0, "records": 0}
+    with open(path) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("input") != os.path.abspath(input_path):
+        raise ValueError(f"Checkpoint {path} belongs to {checkpoint.get('input')}, not {input_path}")
+    return checkpoint
+
+
+def save_checkpoint(path: Optional[str], checkpoint: dict) -> None:
+    if not path:
+        return
+    # Write-then-rename so a crash never leaves a truncated checkpoint behind
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+class ResultWriter:
+    """Appends scored records to a JSONL or CSV file (chosen by extension)."""
+
+    def __init__(self, path: str, append: bool, columns: List[str]):
+        self.is_csv = path.lower().endswith(".csv")
+        write_header = not (append and os.path.exists(path) and os.path.getsize(path) > 0)
+        self.file = open(path, "a" if append else "w", newline="", encoding="utf-8")
+        if self.is_csv:
+            self.writer = csv.DictWriter(self.file, fieldnames=columns)
+            if write_header:
+                self.writer.writeheader()
+
+    def write(self, rows: List[dict]) -> None:
+        for row in rows:
+            if self.is_csv:
+                self.writer.writerow(row)
+            else:
+                self.file.write(json.dumps(row) + "\n")
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def evaluate_file(
+    input_path: str,
+    output_path: Optional[str] = None,
+    save_to_db: bool = True,
+    chunk_size: int = 256,
+    checkpoint_path: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    criteria: Optional[List[str]] = None
+) -> int:
+    """
+    Score every record of a JSONL file, chunk by chunk
+
+    After each chunk the results are written to the database and/or
+    `output_path`, then the checkpoint is advanced. Resuming after a crash
+    restarts from the last completed chunk, so that chunk may be written twice.
+    With `criteria`, only those criteria are scored and written to
+    `output_path`, and the overall score is reweighted over them. Partial
+    scores are never stored in the database, so `criteria` requires
+    `save_to_db=False`.
+
+    Raises:
+        ValueError: if `criteria` is given with `save_to_db`
+
+    Returns:
+        Number of records evaluated in this run
+    """
+    from ai.evaluator import evaluate_batch
+    from repositories.evaluation import create_evaluations_bulk
+
+    if criteria and save_to_db:
+        raise ValueError("Scoring a subset of criteria only works without the database (--no-db)")
+    if save_to_db:
+        from core.database import init_db
+        init_db()
+
+    checkpoint = load_checkpoint(checkpoint_path, input_path)
+    resuming = checkpoint["records"] > 0
+    if resuming:
+        print(f"Resuming after {checkpoint['records']} records", file=sys.stderr)
+
+    writer = ResultWriter(output_path, append=resuming, columns=output_columns(criteria)) if output_path else None
+    records = read_records(input_path, checkpoint["offset"])
+    evaluated = 0
+    started = time.perf_counter()
+    try:
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+
+            pairs = [(record.get("llm_response") or "", record.get("actual_response") or "") for record, _ in chunk]
+            scores = evaluate_batch(pairs, batch_size=batch_size, workers=workers, criteria=criteria).to_dict(orient="records")
+
+            rows = []
+            for (record, _), score in zip(chunk, scores):
+                overall_score = score.pop("overall_score")
+                rows.append({
+                    "llm_response": record.get("llm_response"),
+                    "actual_response": record.get("actual_response"),
+                    "notes": record.get("notes"),
+                    **score,
+                    "overall_score": overall_score
+                })
+            if save_to_db:
+                create_evaluations_bulk(
+                    {
+                        "llm_response": row["llm_response"] or "",
+                        "actual_response": row["actual_response"] or "",
+                        "scores": row,
+                        "overall_score": row["overall_score"],
+                        "notes": row["notes"]
+                    }
+                    for row in rows
+                )
+            if writer:
+                writer.write(rows)
+
+            evaluated += len(chunk)
+            checkpoint["offset"] = chunk[-1][1]
+            checkpoint["records"] += len(chunk)
+            save_checkpoint(checkpoint_path, checkpoint)
+
+            elapsed = time.perf_counter() - started
+            print(f"{checkpoint['records']} records done, {evaluated / elapsed:.1f} records/s", file=sys.stderr)
+    finally:
+        if writer:
+            writer.close()
+
+    return evaluated
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="LLM Text Evaluation Framework command line tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    evaluate_parser = subparsers.add_parser("evaluate", help="Evaluate a JSONL file of response pairs")
+    evaluate_parser.add_argument("input", help="JSONL file with llm_response, actual_response and notes fields")
+    evaluate_parser.add_argument("--output", help="Write scores to this .jsonl or .csv file")
+    evaluate_parser.add_argument("--no-db", action="store_true", help="Do not store evaluations in the database")
+    evaluate_parser.add_argument("--chunk-size", type=int, default=256, help="Records scored per chunk (default: 256)")
+    evaluate_parser.add_argument("--batch-size", type=int, help=f"Encoder batch size (default: {Config.EMBEDDING_BATCH_SIZE})")
+    evaluate_parser.add_argument("--workers", type=int, help=f"Processes for the lexical metrics, 0 to score in-process (default: {Config.SCORING_WORKERS})")
+    evaluate_parser.add_argument(
+        "--criteria",
+        help="Comma-separated criteria to score, skipping the others; needs --no-db (default: all of "
+        + ", ".join(criterion.value for criterion in Config.EVALUATION_CRITERIA_LIST) + ")"
+    )
+    evaluate_parser.add_argument("--checkpoint", help="Checkpoint file used to resume an interrupted run")
+
+    subparsers.add_parser("rescore", help="Recompute stored overall scores with the configured weights")
+
+    export_parser = subparsers.add_parser("export", help="Write evaluations to a .parquet, .arrow/.feather or .csv file")
+    export_parser.add_argument("output", help="File to write; the suffix picks the format unless --format is given")
+    export_parser.add_argument("--format", choices=["parquet", "arrow", "csv"], help="Output format")
+    export_parser.add_argument("--columns", help="Comma-separated columns to export (default: all)")
+    export_parser.add_argument("--date", help="Only evaluations of this day (YYYY-MM-DD)")
+    export_parser.add_argument("--min-score", type=float, help="Only evaluations with at least this overall score")
+    export_parser.add_argument("--search", help="Only evaluations whose responses match this search")
+    export_parser.add_argument("--chunk-size", type=int, help=f"Rows per chunk (default: {Config.EXPORT_CHUNK_SIZE})")
+
+    import_parser = subparsers.add_parser("import", help="Load evaluations from a file written by export")
+    import_parser.add_argument("input", help=".parquet, .arrow/.feather or .csv file")
+    import_parser.add_argument("--format", choices=["parquet", "arrow", "csv"], help="Input format")
+    import_parser.add_argument("--chunk-size", type=int, help=f"Rows per chunk (default: {Config.EXPORT_CHUNK_SIZE})")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "evaluate":
+        if args.no_db and not args.output:
+            parser.error("--no-db requires --output")
+        if args.chunk_size < 1:
+            parser.error("--chunk-size must be positive")
+        criteria = [criterion.strip() for criterion in args.criteria.split(",")] if args.criteria else None
+        valid_criteria = {criterion.value for criterion in Config.EVALUATION_CRITERIA_LIST}
+        if criteria and not set(criteria) <= valid_criteria:
+            parser.error(f"--criteria must be among {', '.join(sorted(valid_criteria))}")
+        if criteria and not args.no_db:
+            parser.error("--criteria requires --no-db: partial scores are not stored in the history")
+        try:
+            evaluated = evaluate_file(
+                args.input,
+                output_path=args.output,
+                save_to_db=not args.no_db,
+                chunk_size=args.chunk_size,
+                checkpoint_path=args.checkpoint,
+                batch_size=args.batch_size,
+                workers=args.workers,
+                criteria=criteria
+            )
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+        print(f"Evaluated {evaluated} records", file=sys.stderr)
+    elif args.command == "rescore":
+        from core.database import init_db
+        from repositories.evaluation import rescore_evaluations
+
+        init_db()
+        updated = rescore_evaluations()
+        print(f"Rescored {updated} evaluations", file=sys.stderr)
+    elif args.command in ("export", "import"):
+        from core.database import init_db
+        from repositories.export import export_evaluations, import_evaluations
+
+        if args.chunk_size is not None and args.chunk_size < 1:
+            parser.error("--chunk-size must be positive")
+        init_db()
+        try:
+            if args.command == "export":
+                written = export_evaluations(
+                    args.output,
+                    file_format=args.format,
+                    columns=[column.strip() for column in args.columns.split(",")] if args.columns else None,
+                    chunk_size=args.chunk_size,
+                    date_filter=args.date,
+                    score_filter=args.min_score,
+                    search_term=args.search
+                )
+                print(f"Exported {written} evaluations", file=sys.stderr)
+            else:
+                imported = import_evaluations(args.input, file_format=args.format, chunk_size=args.chunk_size)
+                print(f"Imported {imported} evaluations", file=sys.stderr)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
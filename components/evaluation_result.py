@@ -15,7 +15,34 @@ def get_score_summary(scores: dict) -> dict:
             summary[criterion] = 'Needs Improvement'
     return summary
 
-def display_evaluation_results(evaluation_data: dict):
+def display_timings(timings: dict):
+    """Display where the time of an instrumented evaluation went"""
+    st.markdown("### ⏱️ Timing Breakdown")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total", f"{timings['total_s'] * 1000:.1f} ms")
+    with col2:
+        cache = timings['embedding_cache']
+        st.metric("Embedding Cache Hits", f"{cache['memory_hits'] + cache['disk_hits']} / {cache['memory_hits'] + cache['disk_hits'] + cache['misses']}" if cache else "disabled")
+    with col3:
+        sizes = timings['text_sizes'].get('llm_response')
+        st.metric("LLM Response Size", f"{sizes['words']} words, {sizes['sentences']} sentences" if sizes else "-")
+    
+    timing_df = pd.DataFrame(
+        [{'Stage': step.replace('_', ' ').title(), 'Type': 'Shared step', 'Milliseconds': seconds * 1000} for step, seconds in timings['steps'].items()]
+        + [{'Stage': criterion.replace('_', ' ').title(), 'Type': 'Criterion', 'Milliseconds': seconds * 1000} for criterion, seconds in timings['criteria'].items()]
+    )
+    if len(timing_df):
+        fig = px.bar(timing_df, x='Milliseconds', y='Stage', color='Type', orientation='h')
+        fig.update_layout(height=400)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    if timings.get('profile'):
+        with st.expander("cProfile report"):
+            st.code(timings['profile'], language=None)
+
+def display_evaluation_results(evaluation_data: dict, timings: dict = None):
     """Display evaluation results in a comprehensive format"""
     st.markdown("## 📊 Evaluation Results")
     
@@ -100,4 +127,7 @@ def display_evaluation_results(evaluation_data: dict):
     # Notes if available
     if evaluation_data.get('notes'):
         st.markdown("### 📌 Notes")
-        st.info(evaluation_data['notes'])
\ No newline at end of file
+        st.info(evaluation_data['notes'])
+    
+    if timings:
+        display_timings(timings)
@@ -1,16 +1,222 @@
 from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy import event, inspect, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.engine import make_url
 from core.config import Config
 import streamlit as st
 
 @st.cache_resource
 def get_engine():
-    return create_engine(Config.DATABASE_URL, echo=False)
+    url = make_url(Config.DATABASE_URL)
     
+    if url.get_backend_name() != "sqlite":
+        return create_engine(
+            url,
+            echo=False,
+            pool_size=Config.DATABASE_POOL_SIZE,
+            max_overflow=Config.DATABASE_MAX_OVERFLOW,
+            pool_timeout=Config.DATABASE_POOL_TIMEOUT,
+            pool_recycle=Config.DATABASE_POOL_RECYCLE,
+            pool_pre_ping=True
+        )
+    
+    connect_args = {
+        # Connections are shared across Streamlit script threads through the pool
+        "check_same_thread": False,
+        "timeout": Config.SQLITE_PRAGMAS.get("busy_timeout", 5000) / 1000
+    }
+    if url.database in (None, "", ":memory:"):
+        # In-memory databases live in a single connection; keep SQLAlchemy's default pool
+        engine = create_engine(url, echo=False, connect_args=connect_args)
+    else:
+        engine = create_engine(
+            url,
+            echo=False,
+            connect_args=connect_args,
+            pool_size=Config.DATABASE_POOL_SIZE,
+            max_overflow=Config.DATABASE_MAX_OVERFLOW,
+            pool_timeout=Config.DATABASE_POOL_TIMEOUT
+        )
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+    return engine
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in Config.SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+    
+@st.cache_resource
 def init_db():
+    # Cached like get_engine: tables and migrations are checked once per process, not on every rerun
     # import all models, so that they are created in the database
-    from models.models import Evaluation
+    from models.models import Evaluation, EvaluationDailyRollup, TextContent
     SQLModel.__table_args__ = {'extend_existing': True} # TODO: we are extending the existing tables to resolve streamlit file changes, need to find a better solution
     SQLModel.metadata.create_all(get_engine())
+    migrate_db()
+
+
+def migrate_db():
+    """
+    Bring a database created by an older version up to the current schema
+    
+    create_all() only creates missing tables, so columns and indexes added to
+    existing tables are created here, and response bodies stored on
+    evaluation rows are moved to text_content. Safe to run on every start.
+    """
+    engine = get_engine()
+    _add_missing_columns(engine)
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+    
+    _drop_legacy_search_index(engine)
+    _move_response_bodies(engine)
+    _create_search_index(engine)
+    get_search_backend.clear()
+    
+    # Backfill rollups for evaluations stored before they were enabled
+    from repositories.analytics import ensure_daily_rollups
+    ensure_daily_rollups()
+
+
+def _add_missing_columns(engine):
+    # Only nullable columns can be added to a table that already has rows
+    inspector = inspect(engine)
+    for table in SQLModel.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        with engine.begin() as connection:
+            for column in table.columns:
+                if column.name not in existing and column.nullable:
+                    connection.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+                    ))
+
+
+def _move_response_bodies(engine, chunk_size: int = 1000):
+    """Move bodies of evaluations stored before text_content existed into it, chunk by chunk"""
+    from sqlalchemy import select, update
+    from models.models import Evaluation
+    from repositories.content import store_texts
+    
+    with Session(engine) as session:
+        while True:
+            rows = session.execute(
+                select(Evaluation.evaluation_id, Evaluation.llm_response, Evaluation.actual_response)
+                .where(Evaluation.llm_response_hash.is_(None))
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            llm_hashes = store_texts(session, [row.llm_response for row in rows])
+            actual_hashes = store_texts(session, [row.actual_response for row in rows])
+            session.execute(update(Evaluation), [
+                {
+                    "evaluation_id": row.evaluation_id,
+                    "llm_response": "",
+                    "actual_response": "",
+                    "llm_response_hash": llm_hash,
+                    "actual_response_hash": actual_hash
+                }
+                for row, llm_hash, actual_hash in zip(rows, llm_hashes, actual_hashes)
+            ])
+            session.commit()
+
+
+# Search over evaluation bodies used before they moved to text_content
+LEGACY_SQLITE_SEARCH_DDL = [
+    "DROP TRIGGER IF EXISTS evaluation_fts_ai",
+    "DROP TRIGGER IF EXISTS evaluation_fts_ad",
+    "DROP TRIGGER IF EXISTS evaluation_fts_au",
+    "DROP TABLE IF EXISTS evaluation_fts",
+]
+LEGACY_POSTGRESQL_SEARCH_DDL = [
+    "ALTER TABLE evaluation DROP COLUMN IF EXISTS search_vector",
+]
+
+# SQLite: FTS5 index over the distinct response texts, kept in sync by triggers
+SQLITE_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE text_content_fts USING fts5(
+        text,
+        content='text_content', content_rowid='content_id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS text_content_fts_ai AFTER INSERT ON text_content BEGIN
+        INSERT INTO text_content_fts(rowid, text) VALUES (new.content_id, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS text_content_fts_ad AFTER DELETE ON text_content BEGIN
+        INSERT INTO text_content_fts(text_content_fts, rowid, text) VALUES ('delete', old.content_id, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS text_content_fts_au AFTER UPDATE OF text ON text_content BEGIN
+        INSERT INTO text_content_fts(text_content_fts, rowid, text) VALUES ('delete', old.content_id, old.text);
+        INSERT INTO text_content_fts(rowid, text) VALUES (new.content_id, new.text);
+    END
+    """,
+    # Index rows that existed before the search index was created
+    "INSERT INTO text_content_fts(text_content_fts) VALUES ('rebuild')",
+]
+
+# PostgreSQL: generated tsvector column (maintained by the server on every write) with a GIN index
+POSTGRESQL_SEARCH_DDL = [
+    """
+    ALTER TABLE text_content ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', coalesce(text, ''))) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_text_content_search_vector ON text_content USING GIN (search_vector)",
+]
+
+def _drop_legacy_search_index(engine):
+    statements = {"sqlite": LEGACY_SQLITE_SEARCH_DDL, "postgresql": LEGACY_POSTGRESQL_SEARCH_DDL}.get(engine.dialect.name, [])
+    if engine.dialect.name == "sqlite" and not inspect(engine).has_table("evaluation_fts"):
+        return
+    with engine.begin() as connection:
+        for statement in statements:
+            connection.execute(text(statement))
+
+def _create_search_index(engine):
+    backend = engine.dialect.name
+    if backend == "sqlite":
+        if inspect(engine).has_table("text_content_fts"):
+            return
+        try:
+            with engine.begin() as connection:
+                for statement in SQLITE_SEARCH_DDL:
+                    connection.execute(text(statement))
+        except OperationalError:
+            # SQLite built without FTS5; search falls back to LIKE
+            pass
+    elif backend == "postgresql":
+        with engine.begin() as connection:
+            for statement in POSTGRESQL_SEARCH_DDL:
+                connection.execute(text(statement))
+
+
+@st.cache_resource
+def get_search_backend() -> str:
+    """
+    Full-text search implementation available in the database
+    
+    Returns:
+        "fts5" (SQLite), "tsvector" (PostgreSQL) or "like" when there is no
+        search index and searches fall back to ILIKE scans
+    """
+    engine = get_engine()
+    inspector = inspect(engine)
+    if engine.dialect.name == "sqlite" and inspector.has_table("text_content_fts"):
+        return "fts5"
+    if engine.dialect.name == "postgresql" and inspector.has_table("text_content"):
+        if any(column["name"] == "search_vector" for column in inspector.get_columns("text_content")):
+            return "tsvector"
+    return "like"
 
 
 def get_session():
@@ -1,17 +1,26 @@
 import streamlit as st
+from core.config import Config
 from core.database import init_db
 from components.sidebar import show_sidebar
 from components.evaluation_result import display_evaluation_results
-from ai.evaluator import evaluate_response, get_overall_score
-from repositories.evaluation import create_evaluation
+from ai.evaluation_service import JOB_DONE, JOB_FAILED, get_evaluation_service
+from ai.evaluator_utils import start_warm_up
+
+@st.fragment(run_every=Config.EVALUATION_POLL_INTERVAL)
+def wait_for_evaluation(job_id: str):
+    """Poll the job without rerunning the page; rerun it once the result is in"""
+    job = get_evaluation_service().get_job(job_id)
+    if job is None or job["status"] in (JOB_DONE, JOB_FAILED):
+        st.rerun()
+    st.info("⏳ Evaluating response...")
 
 def main():
     st.set_page_config(page_title="LLM Text Evaluation Framework", layout="wide")
     init_db()
     show_sidebar()
-    
+
     st.title("LLM Text Evaluation Framework")
-    
+
     with st.form("evaluation_form"):
         llm_response = st.text_area("LLM Response", height=150, placeholder="Paste the LLM response here...")
         actual_response = st.text_area("Actual/Ideal Response", height=150, placeholder="Paste the actual/ideal response here...")
@@ -20,20 +29,40 @@ def main():
             height=100,
             placeholder="e.g., 'Testing new prompt template'"
         )
+        col1, col2 = st.columns(2)
+        with col1:
+            record_timings = st.checkbox("Show timing breakdown", help="Time each preprocessing step and criterion of this evaluation")
+        with col2:
+            profile = st.checkbox("Include cProfile report", help="Profile this evaluation; adds overhead to the reported timings")
         submitted = st.form_submit_button("Evaluate")
 
     if submitted:
         if not llm_response.strip() or not actual_response.strip():
             st.error("Please provide both responses.")
         else:
-            with st.spinner("Evaluating response..."):
-                scores = evaluate_response(llm_response, actual_response)
-                overall_score = get_overall_score(scores)
-                
-                # Create and store the evaluation
-                evaluation = create_evaluation(llm_response, actual_response, scores, overall_score, notes)
-                evaluation_data = evaluation.model_dump()
-                display_evaluation_results(evaluation_data)
+            # Scored and stored by the background workers; this run only submits
+            st.session_state["evaluation_job"] = get_evaluation_service().submit(
+                llm_response,
+                actual_response,
+                notes,
+                record_timings=record_timings,
+                profile="cprofile" if profile else None
+            )
+
+    job_id = st.session_state.get("evaluation_job")
+    if job_id:
+        job = get_evaluation_service().get_job(job_id)
+        if job is None:
+            st.session_state.pop("evaluation_job")
+        elif job["status"] == JOB_DONE:
+            display_evaluation_results(job["result"], timings=job["timings"])
+        elif job["status"] == JOB_FAILED:
+            st.error(f"❌ Evaluation failed: {job['error']}")
+        else:
+            wait_for_evaluation(job_id)
+
+    # Load the model and NLTK data in the background once the form is rendered
+    start_warm_up()
 
 if __name__ == "__main__":
     main()
@@ -1,11 +1,26 @@
 from typing import Optional
 from sqlmodel import Field, SQLModel
-from datetime import datetime
+from sqlalchemy import Index
+from datetime import date, datetime
 
 class Evaluation(SQLModel, table=True):
+    __table_args__ = (
+        # Serves ordering by created_at and date ranges on its own, and covers
+        # the minimum-score filter for date-filtered history pages and counts
+        Index("ix_evaluation_created_at_overall_score", "created_at", "overall_score"),
+        # Keyset pagination: ORDER BY created_at DESC, evaluation_id DESC
+        Index("ix_evaluation_created_at_evaluation_id", "created_at", "evaluation_id"),
+        {'extend_existing': True},
+    )
+
     evaluation_id: Optional[int] = Field(default=None, primary_key=True)
-    llm_response: str
-    actual_response: str
+    # Response bodies live once per distinct text in text_content, referenced
+    # by hash. These columns only hold bodies of databases created before
+    # that, until migrate_db moves them; get_evaluation fills them back in.
+    llm_response: str = ""
+    actual_response: str = ""
+    llm_response_hash: Optional[str] = Field(default=None, index=True, max_length=64)
+    actual_response_hash: Optional[str] = Field(default=None, index=True, max_length=64)
     relevance: float
     accuracy: float
     coherence: float
@@ -13,6 +28,36 @@ class Evaluation(SQLModel, table=True):
     creativity: float
     tone: float
     alignment_with_intent: float
-    overall_score: float
+    overall_score: float = Field(index=True)
     notes: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TextContent(SQLModel, table=True):
+    """A distinct response text, stored once and addressed by its SHA-256"""
+    __tablename__ = "text_content"
+    __table_args__ = {'extend_existing': True}
+
+    # Integer key for the full-text index; evaluations reference content_hash
+    content_id: Optional[int] = Field(default=None, primary_key=True)
+    content_hash: str = Field(unique=True, max_length=64)
+    text: str
+
+
+class EvaluationDailyRollup(SQLModel, table=True):
+    """Per-day score totals, kept up to date on insert so dashboards read one row per day"""
+    __tablename__ = "evaluation_daily_rollup"
+    __table_args__ = {'extend_existing': True}
+
+    day: date = Field(primary_key=True)
+    evaluation_count: int = 0
+    relevance_sum: float = 0.0
+    accuracy_sum: float = 0.0
+    coherence_sum: float = 0.0
+    completeness_sum: float = 0.0
+    creativity_sum: float = 0.0
+    tone_sum: float = 0.0
+    alignment_with_intent_sum: float = 0.0
+    overall_score_sum: float = 0.0
+    overall_score_min: float = 0.0
+    overall_score_max: float = 0.0
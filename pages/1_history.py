@@ -1,7 +1,11 @@
 import streamlit as st
 import pandas as pd
+import plotly.express as px
 from components.sidebar import show_sidebar
-from repositories.evaluation import get_evaluations_paginated, get_evaluations_count
+from core.config import Config
+from core.database import init_db
+from repositories import analytics, evaluation as evaluation_repository
+from repositories.cache import cached_query
 
 
 # Page configuration
@@ -13,25 +17,46 @@ st.set_page_config(
 
 show_sidebar()
 
-def convert_evaluations_to_dict(evaluations):
-    """Convert SQLModel evaluations to dictionaries for easier handling"""
-    return [e.model_dump() for e in evaluations]
+# Widget changes rerun this script; unchanged queries are served from the cache
+get_evaluations_count = cached_query(evaluation_repository.get_evaluations_count)
+get_evaluation_summaries_after = cached_query(evaluation_repository.get_evaluation_summaries_after)
+get_evaluation = cached_query(evaluation_repository.get_evaluation)
+get_score_summary = cached_query(analytics.get_score_summary)
+get_score_histogram = cached_query(analytics.get_score_histogram)
+get_score_trends = cached_query(analytics.get_score_trends)
 
-def show_analytics_dashboard(evaluations_data):
-    """Display comprehensive analytics dashboard"""
-    if not evaluations_data:
-        return
+def get_page(page: int, page_size: int, total_items: int, filters: dict):
+    """
+    Fetch one page through keyset cursors remembered in the session
     
-    df = pd.DataFrame(evaluations_data)
-    df['created_at'] = pd.to_datetime(df['created_at'])
+    Every fetched page stores the cursor of the page after it, so paging
+    forward (or revisiting a page) seeks straight to it. A jump further ahead
+    starts from the nearest known cursor. Cursors are dropped whenever the
+    filters, page size or total count change.
+    """
+    key = (page_size, total_items) + tuple(sorted(filters.items()))
+    cursors = st.session_state.setdefault("history_cursors", {}).setdefault(key, {1: None})
+    start_page = max(p for p in cursors if p <= page)
     
+    evaluations, next_cursor = get_evaluation_summaries_after(
+        cursor=cursors[start_page],
+        page_size=page_size,
+        offset=(page - start_page) * page_size,
+        **filters
+    )
+    if next_cursor:
+        cursors[page + 1] = next_cursor
+    return evaluations
+
+def show_analytics_dashboard(summary, weight_profile=None):
+    """Display comprehensive analytics dashboard"""
     # Key metrics
     st.markdown("### 📊 Key Performance Metrics")
     
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        avg_score = df['overall_score'].mean()
+        avg_score = summary['overall_score_avg']
         st.metric(
             "Average Overall Score", 
             f"{avg_score:.3f}",
@@ -39,20 +64,47 @@ def show_analytics_dashboard(evaluations_data):
         )
     
     with col2:
-        total_evaluations = len(df)
-        st.metric("Total Evaluations", total_evaluations)
+        st.metric("Total Evaluations", summary['count'])
     
     with col3:
-        best_score = df['overall_score'].max()
-        st.metric("Best Score", f"{best_score:.3f}")
+        st.metric("Best Score", f"{summary['overall_score_max']:.3f}")
     
     with col4:
-        worst_score = df['overall_score'].min()
-        st.metric("Lowest Score", f"{worst_score:.3f}")
-
+        st.metric("Lowest Score", f"{summary['overall_score_min']:.3f}")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("#### Average Score by Criterion")
+        criteria = [criterion.value for criterion in Config.EVALUATION_CRITERIA_LIST]
+        fig = px.bar(
+            x=[criterion.replace('_', ' ').title() for criterion in criteria],
+            y=[summary[f"{criterion}_avg"] for criterion in criteria],
+            labels={'x': 'Criterion', 'y': 'Average Score'},
+            range_y=[0, 1]
+        )
+        fig.update_layout(height=350)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        st.markdown("#### Overall Score Distribution")
+        histogram = pd.DataFrame(get_score_histogram(weight_profile=weight_profile))
+        fig = px.bar(
+            x=[f"{row.bucket_start:.1f}-{row.bucket_end:.1f}" for row in histogram.itertuples()],
+            y=histogram['count'],
+            labels={'x': 'Overall Score', 'y': 'Evaluations'}
+        )
+        fig.update_layout(height=350)
+        st.plotly_chart(fig, use_container_width=True)
     
+    trends = pd.DataFrame(get_score_trends(period="day", days=90, weight_profile=weight_profile))
+    if len(trends) > 1:
+        st.markdown("#### Daily Average Overall Score (last 90 days)")
+        fig = px.line(trends, x='period', y='overall_score_avg', markers=True, labels={'period': 'Day', 'overall_score_avg': 'Average Overall Score'})
+        fig.update_layout(height=350)
+        st.plotly_chart(fig, use_container_width=True)
 
-def show_filtered_table():
+def show_filtered_table(weight_profile=None):
     """Display filtered and paginated table of evaluations"""
     st.markdown("### 📋 Evaluation Records")
     
@@ -63,7 +115,7 @@ def show_filtered_table():
         search_term = st.text_input(
             "Search in responses:", 
             placeholder="Enter keywords...",
-            help="Search in both LLM and actual responses"
+            help='Search in both LLM and actual responses. Words match as prefixes; use "quotes" for exact phrases.'
         )
         
     with col2:
@@ -84,12 +136,15 @@ def show_filtered_table():
             value=None,
             help="Select a specific date to filter evaluations"
         )
+    filters = {
+        "date_filter": date_filter.strftime('%Y-%m-%d') if date_filter else None,
+        "score_filter": score_filter,
+        "search_term": search_term,
+        "weight_profile": weight_profile
+    }
+    
     # Get total count for pagination
-    total_items = get_evaluations_count(
-        date_filter=date_filter.strftime('%Y-%m-%d') if date_filter else None,
-        score_filter=score_filter,
-        search_term=search_term
-    )
+    total_items = get_evaluations_count(**filters)
     
     with col2:
             items_per_page = st.selectbox(
@@ -113,16 +168,8 @@ def show_filtered_table():
         return
         
     
-    # Fetch paginated data from database
-    evaluations, _ = get_evaluations_paginated(
-        page=current_page,
-        page_size=items_per_page,
-        date_filter=date_filter.strftime('%Y-%m-%d') if date_filter else None,
-        score_filter=score_filter,
-        search_term=search_term
-    )
-    
-    evaluations_data = convert_evaluations_to_dict(evaluations)
+    # Fetch paginated data from database (scores and previews only)
+    evaluations_data = get_page(current_page, items_per_page, total_items, filters)
     
     start_idx = (current_page - 1) * items_per_page + 1
     end_idx = min(start_idx + items_per_page - 1, total_items)
@@ -131,15 +178,25 @@ def show_filtered_table():
     # Display table
     for idx, evaluation in enumerate(evaluations_data):
         with st.expander(f"Evaluation #{evaluation['evaluation_id']} - Score: {evaluation['overall_score']:.3f} - {evaluation['created_at'].strftime('%Y-%m-%d %H:%M')}"):
+            # Full response bodies are only loaded on request
+            show_full = st.toggle("Show full responses", key=f"full_{evaluation['evaluation_id']}")
+            if show_full:
+                full_evaluation = get_evaluation(evaluation['evaluation_id'])
+                llm_response = full_evaluation.llm_response if full_evaluation else ""
+                actual_response = full_evaluation.actual_response if full_evaluation else ""
+            else:
+                llm_response = evaluation['llm_response_preview']
+                actual_response = evaluation['actual_response_preview']
+            
             col1, col2 = st.columns(2)
             
             with col1:
                 st.markdown("**LLM Response:**")
                 st.text_area(
                     "LLM Response",
-                    value=evaluation['llm_response'],
+                    value=llm_response,
                     height=150,
-                    key=f"llm_{evaluation['evaluation_id']}",
+                    key=f"llm_{evaluation['evaluation_id']}_{show_full}",
                     disabled=True
                 )
             
@@ -147,9 +204,9 @@ def show_filtered_table():
                 st.markdown("**Actual Response:**")
                 st.text_area(
                     "Actual Response",
-                    value=evaluation['actual_response'],
+                    value=actual_response,
                     height=150,
-                    key=f"actual_{evaluation['evaluation_id']}",
+                    key=f"actual_{evaluation['evaluation_id']}_{show_full}",
                     disabled=True
                 )
             
@@ -173,25 +230,30 @@ def main():
     st.markdown("---")
     
     try:
-        # Get total count for analytics (we need some data for the dashboard)
-        total_count = get_evaluations_count()
+        # This page can be opened first, so make sure tables and rollups exist
+        init_db()
+        
+        # Overall scores are recomputed from the stored criterion scores, without re-evaluating
+        weight_profile = st.selectbox(
+            "Overall score weights:",
+            options=[None, *Config.WEIGHT_PROFILES],
+            format_func=lambda name: "Stored scores" if name is None else name.title(),
+            help="Show overall scores under a weight profile from Config.WEIGHT_PROFILES"
+        )
         
-        if total_count == 0:
+        # Aggregates over the full history are computed by the database
+        summary = get_score_summary(weight_profile)
+        
+        if summary['count'] == 0:
             st.info("📝 No evaluation history yet. Start by evaluating some responses!")
             return
         
-        # For analytics dashboard, we'll fetch a sample of recent data
-        # This is more efficient than fetching all data for analytics
-        recent_evaluations, _ = get_evaluations_paginated(page=1, page_size=100)
-        evaluations_data = convert_evaluations_to_dict(recent_evaluations)
-        
-        # Show analytics dashboard with recent data
-        show_analytics_dashboard(evaluations_data)
+        show_analytics_dashboard(summary, weight_profile)
         
         st.markdown("---")
         
         # Show filtered table with pagination
-        show_filtered_table()
+        show_filtered_table(weight_profile)
         
         
     except Exception as e:
@@ -0,0 +1,306 @@
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+from sqlalchemy import Integer, cast, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from models.models import Evaluation, EvaluationDailyRollup
+from core.config import Config
+from core.database import get_session
+from repositories.scoring import WeightProfile, get_weights, score_column
+
+SCORE_COLUMNS = [criterion.value for criterion in Config.EVALUATION_CRITERIA_LIST] + ["overall_score"]
+
+
+def _dialect(session) -> str:
+    return session.get_bind().dialect.name
+
+
+def _score(column: str, weight_profile: Optional[WeightProfile]):
+    # A weight profile only changes the overall score
+    return score_column(weight_profile) if column == "overall_score" else getattr(Evaluation, column)
+
+
+def _least(session, *values):
+    # SQLite's multi-argument min() is PostgreSQL's least()
+    return func.least(*values) if _dialect(session) == "postgresql" else func.min(*values)
+
+
+def _greatest(session, *values):
+    return func.greatest(*values) if _dialect(session) == "postgresql" else func.max(*values)
+
+
+def update_daily_rollups(session, rows: Sequence[dict]) -> None:
+    """
+    Add freshly inserted evaluation rows to the daily rollup table
+    
+    Runs inside the caller's session so the rollup commits (or rolls back)
+    together with the evaluations. Rows are pre-aggregated per day, so a bulk
+    insert costs one upsert per distinct day.
+    """
+    if not Config.ANALYTICS_ROLLUPS_ENABLED or not rows:
+        return
+    
+    days = defaultdict(lambda: {"evaluation_count": 0, **{f"{column}_sum": 0.0 for column in SCORE_COLUMNS}})
+    for row in rows:
+        bucket = days[row["created_at"].date()]
+        bucket["evaluation_count"] += 1
+        for column in SCORE_COLUMNS:
+            bucket[f"{column}_sum"] += row[column]
+        score = row["overall_score"]
+        bucket["overall_score_min"] = min(bucket.get("overall_score_min", score), score)
+        bucket["overall_score_max"] = max(bucket.get("overall_score_max", score), score)
+    
+    dialect = postgresql if _dialect(session) == "postgresql" else sqlite
+    table = EvaluationDailyRollup.__table__
+    for day, values in days.items():
+        statement = dialect.insert(table).values(day=day, **values)
+        excluded = statement.excluded
+        session.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.day],
+            set_={
+                "evaluation_count": table.c.evaluation_count + excluded.evaluation_count,
+                **{f"{column}_sum": table.c[f"{column}_sum"] + excluded[f"{column}_sum"] for column in SCORE_COLUMNS},
+                "overall_score_min": _least(session, table.c.overall_score_min, excluded.overall_score_min),
+                "overall_score_max": _greatest(session, table.c.overall_score_max, excluded.overall_score_max),
+            }
+        ))
+
+
+def rebuild_daily_rollups() -> int:
+    """
+    Recompute the daily rollup table from the evaluation table
+    
+    Needed once when rollups are enabled on an existing database, and after
+    bulk changes that bypass the repository (e.g. rescoring stored rows).
+    
+    Returns:
+        Number of days in the rollup
+    """
+    with get_session() as session:
+        day = _day_bucket(session)
+        aggregates = (
+            session.query(
+                day.label("day"),
+                func.count().label("evaluation_count"),
+                *[func.sum(getattr(Evaluation, column)).label(f"{column}_sum") for column in SCORE_COLUMNS],
+                func.min(Evaluation.overall_score).label("overall_score_min"),
+                func.max(Evaluation.overall_score).label("overall_score_max"),
+            )
+            .group_by(day)
+            .all()
+        )
+        session.query(EvaluationDailyRollup).delete()
+        for row in aggregates:
+            values = row._asdict()
+            if isinstance(values["day"], str):
+                values["day"] = date.fromisoformat(values["day"])
+            elif isinstance(values["day"], datetime):
+                values["day"] = values["day"].date()
+            session.add(EvaluationDailyRollup(**values))
+        session.commit()
+        return len(aggregates)
+
+
+def ensure_daily_rollups() -> None:
+    """Backfill the rollup table if it is empty while evaluations exist"""
+    if not Config.ANALYTICS_ROLLUPS_ENABLED:
+        return
+    with get_session() as session:
+        has_rollups = session.query(select(EvaluationDailyRollup.day).exists()).scalar()
+        has_evaluations = session.query(select(Evaluation.evaluation_id).exists()).scalar()
+    if has_evaluations and not has_rollups:
+        rebuild_daily_rollups()
+
+
+def get_score_summary(weight_profile: Optional[WeightProfile] = None) -> Dict[str, float]:
+    """
+    Aggregate scores over the whole history
+    
+    With a `weight_profile` the overall score statistics are computed from
+    the criterion scores with the profile's weights instead of the stored
+    overall_score.
+    
+    Returns:
+        Dict with `count`, `<criterion>_avg` for every criterion and for
+        `overall_score`, plus `overall_score_min` and `overall_score_max`
+    """
+    with get_session() as session:
+        if Config.ANALYTICS_ROLLUPS_ENABLED:
+            rollup = EvaluationDailyRollup
+            row = session.query(
+                func.sum(rollup.evaluation_count).label("count"),
+                *[func.sum(getattr(rollup, f"{column}_sum")).label(f"{column}_sum") for column in SCORE_COLUMNS],
+                func.min(rollup.overall_score_min).label("overall_score_min"),
+                func.max(rollup.overall_score_max).label("overall_score_max"),
+            ).one()
+            count = row.count or 0
+            summary = {"count": count}
+            for column in SCORE_COLUMNS:
+                summary[f"{column}_avg"] = (getattr(row, f"{column}_sum") or 0.0) / count if count else 0.0
+        else:
+            row = session.query(
+                func.count().label("count"),
+                *[func.avg(getattr(Evaluation, column)).label(f"{column}_avg") for column in SCORE_COLUMNS],
+                func.min(Evaluation.overall_score).label("overall_score_min"),
+                func.max(Evaluation.overall_score).label("overall_score_max"),
+            ).one()
+            summary = {"count": row.count}
+            for column in SCORE_COLUMNS:
+                summary[f"{column}_avg"] = getattr(row, f"{column}_avg") or 0.0
+        summary["overall_score_min"] = row.overall_score_min or 0.0
+        summary["overall_score_max"] = row.overall_score_max or 0.0
+        
+        if weight_profile is not None:
+            # The average is linear in the criterion averages; min and max need a scan
+            summary["overall_score_avg"] = sum(
+                weight * summary[f"{criterion.value}_avg"] for criterion, weight in get_weights(weight_profile).items()
+            )
+            score = score_column(weight_profile)
+            row = session.query(func.min(score), func.max(score)).one()
+            summary["overall_score_min"], summary["overall_score_max"] = row[0] or 0.0, row[1] or 0.0
+        return summary
+
+
+def get_score_percentiles(
+    column: str = "overall_score",
+    percentiles: Sequence[float] = (0.25, 0.5, 0.75, 0.9),
+    weight_profile: Optional[WeightProfile] = None
+) -> Dict[float, float]:
+    """
+    Nearest-rank percentiles of a score column
+    
+    On SQLite each percentile is a single ORDER BY ... LIMIT 1 OFFSET k
+    lookup, which walks the index when the column is indexed (overall_score
+    is). PostgreSQL uses percentile_disc. A `weight_profile` recomputes the
+    overall score (without an index).
+    """
+    score = _score(column, weight_profile)
+    with get_session() as session:
+        if _dialect(session) == "postgresql":
+            row = session.query(*[
+                func.percentile_disc(p).within_group(score.asc()) for p in percentiles
+            ]).one()
+            return {p: value for p, value in zip(percentiles, row)}
+        
+        count = session.query(func.count(Evaluation.evaluation_id)).scalar()
+        if not count:
+            return {p: 0.0 for p in percentiles}
+        return {
+            p: session.query(score).order_by(score.asc()).offset(round(p * (count - 1))).limit(1).scalar()
+            for p in percentiles
+        }
+
+
+def get_score_histogram(
+    column: str = "overall_score",
+    bins: int = 10,
+    weight_profile: Optional[WeightProfile] = None
+) -> List[Dict[str, float]]:
+    """
+    Count evaluations per equal-width bucket of a score in [0, 1]
+    
+    A `weight_profile` recomputes the overall score with the profile's weights.
+    
+    Returns:
+        List of {bucket_start, bucket_end, count} for every bucket, including empty ones
+    """
+    score = _score(column, weight_profile)
+    with get_session() as session:
+        if _dialect(session) == "postgresql":
+            bucket = cast(func.floor(score * bins), Integer)
+        else:
+            # Scores are non-negative, so truncation is floor
+            bucket = cast(score * bins, Integer)
+        # A perfect 1.0 belongs to the last bucket
+        bucket = _least(session, bucket, bins - 1)
+        counts = dict(session.query(bucket, func.count()).group_by(bucket).all())
+    return [
+        {"bucket_start": i / bins, "bucket_end": (i + 1) / bins, "count": counts.get(i, 0)}
+        for i in range(bins)
+    ]
+
+
+def get_score_trends(
+    period: str = "day",
+    days: int = None,
+    weight_profile: Optional[WeightProfile] = None
+) -> List[Dict[str, float]]:
+    """
+    Average scores per day or week, oldest first
+    
+    Reads the daily rollup table when Config.ANALYTICS_ROLLUPS_ENABLED is set
+    (one row per day), otherwise groups the evaluation table by created_at.
+    
+    Args:
+        period: "day" or "week" (weeks start on Monday)
+        days: only include the last `days` days
+        weight_profile: compute overall_score_avg from the criterion averages
+            with this profile's weights instead of the stored overall_score
+    
+    Returns:
+        List of dicts with `period` (date of the day or week start), `count`
+        and `<criterion>_avg` for every criterion and overall_score
+    """
+    if period not in ("day", "week"):
+        raise ValueError(f"Unsupported period: {period}")
+    # created_at is stored in UTC
+    since = datetime.utcnow().date() - timedelta(days=days) if days else None
+    
+    with get_session() as session:
+        if Config.ANALYTICS_ROLLUPS_ENABLED:
+            query = session.query(EvaluationDailyRollup)
+            if since:
+                query = query.filter(EvaluationDailyRollup.day >= since)
+            daily = [
+                {
+                    "day": rollup.day,
+                    "count": rollup.evaluation_count,
+                    **{f"{column}_sum": getattr(rollup, f"{column}_sum") for column in SCORE_COLUMNS},
+                }
+                for rollup in query.order_by(EvaluationDailyRollup.day).all()
+            ]
+        else:
+            day = _day_bucket(session)
+            query = session.query(
+                day.label("day"),
+                func.count().label("count"),
+                *[func.sum(getattr(Evaluation, column)).label(f"{column}_sum") for column in SCORE_COLUMNS],
+            )
+            if since:
+                query = query.filter(Evaluation.created_at >= datetime.combine(since, datetime.min.time()))
+            daily = [row._asdict() for row in query.group_by(day).order_by(day).all()]
+    
+    # Days are few compared to rows, so weekly buckets are summed up here
+    buckets = {}
+    for row in daily:
+        day_value = row["day"]
+        if isinstance(day_value, str):
+            day_value = date.fromisoformat(day_value)
+        elif isinstance(day_value, datetime):
+            day_value = day_value.date()
+        key = day_value - timedelta(days=day_value.weekday()) if period == "week" else day_value
+        bucket = buckets.setdefault(key, {"count": 0, **{column: 0.0 for column in SCORE_COLUMNS}})
+        bucket["count"] += row["count"]
+        for column in SCORE_COLUMNS:
+            bucket[column] += row[f"{column}_sum"] or 0.0
+    
+    if weight_profile is not None:
+        weights = get_weights(weight_profile)
+        for bucket in buckets.values():
+            bucket["overall_score"] = sum(weight * bucket[criterion.value] for criterion, weight in weights.items())
+    
+    return [
+        {
+            "period": key,
+            "count": bucket["count"],
+            **{f"{column}_avg": bucket[column] / bucket["count"] for column in SCORE_COLUMNS},
+        }
+        for key, bucket in sorted(buckets.items())
+        if bucket["count"]
+    ]
+
+
+def _day_bucket(session):
+    if _dialect(session) == "postgresql":
+        return func.date_trunc("day", Evaluation.created_at)
+    return func.date(Evaluation.created_at)
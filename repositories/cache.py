@@ -0,0 +1,45 @@
+import functools
+import threading
+import streamlit as st
+from core.config import Config
+
+# Incremented by every repository write. It is part of each cache key, so a
+# write makes all earlier query results unreachable without tracking which
+# queries it affects. Writes from other processes (e.g. cli.py) are only
+# picked up once the TTL expires.
+_data_version = 0
+_data_version_lock = threading.Lock()
+
+_queries = {}
+
+
+def get_data_version() -> int:
+    return _data_version
+
+
+def bump_data_version() -> None:
+    global _data_version
+    with _data_version_lock:
+        _data_version += 1
+
+
+@st.cache_data(ttl=Config.QUERY_CACHE_TTL, max_entries=Config.QUERY_CACHE_MAX_ENTRIES, show_spinner=False)
+def _run_cached(query_name: str, data_version: int, args: tuple, kwargs: dict):
+    return _queries[query_name](*args, **kwargs)
+
+
+def cached_query(func):
+    """
+    Cache a repository read across Streamlit reruns and sessions
+
+    Results are keyed on the function, its arguments and the data version,
+    and expire after Config.QUERY_CACHE_TTL seconds.
+    """
+    query_name = f"{func.__module__}.{func.__qualname__}"
+    _queries[query_name] = func
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return _run_cached(query_name, get_data_version(), args, kwargs)
+
+    return wrapper
@@ -0,0 +1,44 @@
+import hashlib
+from typing import Dict, Iterable, List
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from models.models import TextContent
+
+
+def content_hash(text: str) -> str:
+    """SHA-256 of the exact text; identical bodies share one text_content row"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def store_texts(session, texts: Iterable[str]) -> List[str]:
+    """
+    Make sure every text has a text_content row and return their hashes
+    
+    Runs inside the caller's session, so the texts commit together with the
+    evaluations referencing them. Each distinct text is written at most once.
+    
+    Returns:
+        Hashes in the order of `texts`
+    """
+    texts = list(texts)
+    hashes = [content_hash(text) for text in texts]
+    unique = dict(zip(hashes, texts))
+    if unique:
+        dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+        statement = dialect.insert(TextContent.__table__).on_conflict_do_nothing(index_elements=["content_hash"])
+        session.execute(statement, [{"content_hash": key, "text": text} for key, text in unique.items()])
+    return hashes
+
+
+def get_texts(session, hashes: Iterable[str]) -> Dict[str, str]:
+    """Texts of the given hashes, keyed by hash"""
+    hashes = list({key for key in hashes if key})
+    texts = {}
+    # Stay well below the bound parameter limit of SQLite
+    for start in range(0, len(hashes), 500):
+        rows = session.execute(
+            select(TextContent.content_hash, TextContent.text)
+            .where(TextContent.content_hash.in_(hashes[start:start + 500]))
+        )
+        texts.update(dict(rows.all()))
+    return texts
@@ -1,19 +1,27 @@
-from models.models import Evaluation
+from models.models import Evaluation, TextContent
 from core.database import get_session
-from typing import List, Tuple
-from sqlalchemy import func
+from repositories.content import get_texts, store_texts
+from repositories.search import search_filter
+from repositories.analytics import rebuild_daily_rollups, update_daily_rollups
+from repositories.cache import bump_data_version
+from repositories.scoring import WeightProfile, score_column, weighted_score
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Iterable, List, Optional, Tuple
+from sqlalchemy import func, insert, update
+from sqlalchemy.orm import aliased
+from core.config import Config
 
-def create_evaluation(
-    llm_response: str,
-    actual_response: str,
+def _evaluation_values(
+    llm_response_hash: str,
+    actual_response_hash: str,
     scores: dict,
     overall_score: float,
     notes: str = None
-) -> Evaluation:
-    """Store an evaluation in the database"""
-    evaluation = Evaluation(
-        llm_response=llm_response,
-        actual_response=actual_response,
+) -> dict:
+    return dict(
+        llm_response_hash=llm_response_hash,
+        actual_response_hash=actual_response_hash,
         relevance=scores.get("relevance", 0.0),
         accuracy=scores.get("accuracy", 0.0),
         coherence=scores.get("coherence", 0.0),
@@ -24,14 +32,142 @@ def create_evaluation(
         overall_score=overall_score,
         notes=notes
     )
-    
+
+def create_evaluation(
+    llm_response: str,
+    actual_response: str,
+    scores: dict,
+    overall_score: float,
+    notes: str = None
+) -> Evaluation:
+    """Store an evaluation in the database; each response body is stored once per distinct text"""
     with get_session() as session:
+        llm_response_hash, actual_response_hash = store_texts(session, [llm_response, actual_response])
+        evaluation = Evaluation(**_evaluation_values(llm_response_hash, actual_response_hash, scores, overall_score, notes))
         session.add(evaluation)
+        update_daily_rollups(session, [evaluation.model_dump()])
         session.commit()
+        bump_data_version()
         session.refresh(evaluation)
+        session.expunge(evaluation)
+        evaluation.llm_response, evaluation.actual_response = llm_response, actual_response
         return evaluation
 
 
+def create_evaluations_bulk(
+    evaluations: Iterable[dict],
+    chunk_size: Optional[int] = None
+) -> int:
+    """
+    Store many evaluations with executemany inserts
+    
+    Each item takes the arguments of create_evaluation as keys
+    (llm_response, actual_response, scores, overall_score and optional notes),
+    plus an optional created_at (defaults to the time its chunk is written).
+    Response bodies already stored, or repeated within the batch, are not
+    written again. Rows are not refreshed afterwards. Everything is committed in a single
+    transaction unless `chunk_size` is given, in which case every chunk of that
+    many rows is committed separately.
+    
+    Returns:
+        Number of evaluations inserted
+    """
+    items = iter(evaluations)
+    inserted = 0
+    with get_session() as session:
+        while True:
+            chunk = list(islice(items, chunk_size)) if chunk_size else list(items)
+            if not chunk:
+                break
+            created_at = datetime.utcnow()
+            hashes = store_texts(session, [text for item in chunk for text in (item["llm_response"], item["actual_response"])])
+            rows = [
+                {**_evaluation_values(
+                    llm_response_hash,
+                    actual_response_hash,
+                    item["scores"],
+                    item["overall_score"],
+                    item.get("notes")
+                ), "created_at": item.get("created_at") or created_at}
+                for item, llm_response_hash, actual_response_hash in zip(chunk, hashes[::2], hashes[1::2])
+            ]
+            session.execute(insert(Evaluation), rows)
+            update_daily_rollups(session, rows)
+            inserted += len(rows)
+            if chunk_size:
+                session.commit()
+                bump_data_version()
+            else:
+                break
+        session.commit()
+    bump_data_version()
+    return inserted
+
+
+def rescore_evaluations() -> int:
+    """
+    Recompute the stored overall_score of every evaluation from its criterion scores
+    
+    One UPDATE statement applies Config.EVALUATION_CRITERIA_WEIGHTS, the
+    weights new evaluations are stored with, in the database, so no
+    evaluator runs. Run it after changing the weights; daily rollups are
+    rebuilt afterwards. Weight profiles are never written back: pass them
+    to the queries instead.
+    
+    Returns:
+        Number of evaluations updated
+    """
+    with get_session() as session:
+        updated = session.execute(update(Evaluation).values(overall_score=weighted_score())).rowcount
+        session.commit()
+    if Config.ANALYTICS_ROLLUPS_ENABLED:
+        rebuild_daily_rollups()
+    bump_data_version()
+    return updated
+
+
+def attach_texts(session, evaluations: List[Evaluation]) -> List[Evaluation]:
+    """
+    Fill in the response bodies of evaluations loaded by `session`
+
+    The evaluations are detached first so the bodies are not written back.
+    All texts are fetched with one lookup per 500 distinct hashes.
+    """
+    for evaluation in evaluations:
+        session.expunge(evaluation)
+    texts = get_texts(session, [
+        key for evaluation in evaluations for key in (evaluation.llm_response_hash, evaluation.actual_response_hash)
+    ])
+    for evaluation in evaluations:
+        evaluation.llm_response = texts.get(evaluation.llm_response_hash, evaluation.llm_response)
+        evaluation.actual_response = texts.get(evaluation.actual_response_hash, evaluation.actual_response)
+    return evaluations
+
+
+def _apply_filters(
+    query,
+    date_filter: str = None,
+    score_filter: float = None,
+    search_term: str = None,
+    weight_profile: Optional[WeightProfile] = None
+):
+    if date_filter:
+        # Range on created_at rather than func.date() so the index can be used
+        day_start = datetime.strptime(date_filter, '%Y-%m-%d')
+        query = query.filter(
+            Evaluation.created_at >= day_start,
+            Evaluation.created_at < day_start + timedelta(days=1)
+        )
+    
+    if score_filter is not None:
+        query = query.filter(score_column(weight_profile) >= score_filter)
+    
+    if search_term:
+        query = query.filter(search_filter(search_term))
+    
+    return query
+
+
 def get_evaluations_paginated(
     page: int = 1, 
     page_size: int = 10,
@@ -46,21 +182,7 @@ def get_evaluations_paginated(
         Tuple of (evaluations, total_count)
     """
     with get_session() as session:
-        query = session.query(Evaluation)
-        
-        # Apply filters
-        if date_filter:
-            query = query.filter(func.date(Evaluation.created_at) == date_filter)
-        
-        if score_filter is not None:
-            query = query.filter(Evaluation.overall_score >= score_filter)
-        
-        if search_term:
-            search_pattern = f"%{search_term}%"
-            query = query.filter(
-                (Evaluation.llm_response.ilike(search_pattern)) |
-                (Evaluation.actual_response.ilike(search_pattern))
-            )
+        query = _apply_filters(session.query(Evaluation), date_filter, score_filter, search_term)
         
         # Get total count for pagination
         total_count = query.count()
@@ -69,29 +191,109 @@ def get_evaluations_paginated(
         offset = (page - 1) * page_size
         evaluations = query.order_by(Evaluation.created_at.desc()).offset(offset).limit(page_size).all()
         
-        return evaluations, total_count
+        return attach_texts(session, evaluations), total_count
 
-def get_evaluations_count(
+def _keyset_page(query, cursor, page_size: int, offset: int):
+    if cursor:
+        created_at, evaluation_id = cursor
+        # The first condition alone is a range on the index; the second breaks ties
+        query = query.filter(
+            Evaluation.created_at <= created_at,
+            (Evaluation.created_at < created_at) | (Evaluation.evaluation_id < evaluation_id)
+        )
+    
+    rows = (
+        query.order_by(Evaluation.created_at.desc(), Evaluation.evaluation_id.desc())
+        .offset(offset)
+        .limit(page_size + 1)
+        .all()
+    )
+    
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, (rows[-1].created_at, rows[-1].evaluation_id)
+
+def get_evaluations_after(
+    cursor: Optional[Tuple[datetime, int]] = None,
+    page_size: int = 10,
+    offset: int = 0,
     date_filter: str = None,
     score_filter: float = None,
     search_term: str = None
+) -> Tuple[List[Evaluation], Optional[Tuple[datetime, int]]]:
+    """
+    Retrieve a page of evaluations after a keyset cursor, newest first
+    
+    Rows are ordered by (created_at, evaluation_id) descending and the page
+    starts right after `cursor` (or at the newest row when it is None), so
+    the cost does not grow with the page number. `offset` skips rows past the
+    cursor, for jumping several pages ahead of the nearest known cursor.
+    
+    Returns:
+        Tuple of (evaluations, next_cursor); next_cursor is None on the last page
+    """
+    with get_session() as session:
+        query = _apply_filters(session.query(Evaluation), date_filter, score_filter, search_term)
+        evaluations, next_cursor = _keyset_page(query, cursor, page_size, offset)
+        return attach_texts(session, evaluations), next_cursor
+
+def get_evaluation_summaries_after(
+    cursor: Optional[Tuple[datetime, int]] = None,
+    page_size: int = 10,
+    offset: int = 0,
+    date_filter: str = None,
+    score_filter: float = None,
+    search_term: str = None,
+    preview_length: int = None,
+    weight_profile: Optional[WeightProfile] = None
+) -> Tuple[List[dict], Optional[Tuple[datetime, int]]]:
+    """
+    Same as get_evaluations_after, but without loading the response bodies
+    
+    Each row is a dict with the id, timestamp, scores, notes and the first
+    `preview_length` characters of both responses (`llm_response_preview`,
+    `actual_response_preview`). Use get_evaluation() for the full texts.
+    With a `weight_profile`, `overall_score` (and `score_filter`) use the
+    profile's weights instead of the stored score.
+    """
+    preview_length = preview_length or Config.HISTORY_PREVIEW_LENGTH
+    llm_text = aliased(TextContent)
+    actual_text = aliased(TextContent)
+    columns = [
+        Evaluation.evaluation_id,
+        Evaluation.created_at,
+        *[getattr(Evaluation, criterion.value) for criterion in Config.EVALUATION_CRITERIA_LIST],
+        score_column(weight_profile).label("overall_score"),
+        Evaluation.notes,
+        func.substr(llm_text.text, 1, preview_length).label("llm_response_preview"),
+        func.substr(actual_text.text, 1, preview_length).label("actual_response_preview"),
+    ]
+    with get_session() as session:
+        query = (
+            session.query(*columns)
+            .select_from(Evaluation)
+            .outerjoin(llm_text, llm_text.content_hash == Evaluation.llm_response_hash)
+            .outerjoin(actual_text, actual_text.content_hash == Evaluation.actual_response_hash)
+        )
+        query = _apply_filters(query, date_filter, score_filter, search_term, weight_profile)
+        rows, next_cursor = _keyset_page(query, cursor, page_size, offset)
+        return [row._asdict() for row in rows], next_cursor
+
+def get_evaluation(evaluation_id: int) -> Optional[Evaluation]:
+    """Retrieve a single evaluation, including both response bodies"""
+    with get_session() as session:
+        evaluation = session.get(Evaluation, evaluation_id)
+        return attach_texts(session, [evaluation])[0] if evaluation else None
+
+def get_evaluations_count(
+    date_filter: str = None,
+    score_filter: float = None,
+    search_term: str = None,
+    weight_profile: Optional[WeightProfile] = None
 ) -> int:
-    """Get total count of evaluations with optional filters"""
+    """Get total count of evaluations with optional filters; `weight_profile` applies to `score_filter`"""
     with get_session() as session:
-        query = session.query(Evaluation)
-        
-        # Apply filters
-        if date_filter:
-            query = query.filter(func.date(Evaluation.created_at) == date_filter)
-        
-        if score_filter is not None:
-            query = query.filter(Evaluation.overall_score >= score_filter)
-        
-        if search_term:
-            search_pattern = f"%{search_term}%"
-            query = query.filter(
-                (Evaluation.llm_response.ilike(search_pattern)) |
-                (Evaluation.actual_response.ilike(search_pattern))
-            )
+        query = _apply_filters(session.query(Evaluation), date_filter, score_filter, search_term, weight_profile)
         
         return query.count()
@@ -0,0 +1,214 @@
+import csv
+import os
+from datetime import datetime
+from itertools import chain, islice
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy.orm import aliased
+from models.models import Evaluation, TextContent
+from core.config import Config
+from core.database import get_session
+from repositories.evaluation import _apply_filters, create_evaluations_bulk
+from repositories.scoring import get_weights
+
+CRITERIA_COLUMNS = [criterion.value for criterion in Config.EVALUATION_CRITERIA_LIST]
+EXPORT_COLUMNS = (
+    ["evaluation_id", "created_at", "llm_response", "actual_response"]
+    + CRITERIA_COLUMNS
+    + ["overall_score", "notes"]
+)
+TEXT_COLUMNS = {"llm_response", "actual_response", "notes"}
+NUMERIC_COLUMNS = {"evaluation_id", "overall_score", *CRITERIA_COLUMNS}
+
+# File suffix -> format
+EXPORT_FORMATS = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow", ".csv": "csv"}
+
+
+def _file_format(path: str, file_format: Optional[str]) -> str:
+    if file_format:
+        if file_format not in EXPORT_FORMATS.values():
+            raise ValueError(f"Unsupported format: {file_format} (choose from parquet, arrow, csv)")
+        return file_format
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix not in EXPORT_FORMATS:
+        raise ValueError(f"Cannot tell the format of {path}; use a .parquet, .arrow, .feather or .csv file or pass the format")
+    return EXPORT_FORMATS[suffix]
+
+
+def _arrow_schema(columns: List[str]):
+    import pyarrow as pa
+    
+    types = {"evaluation_id": pa.int64(), "created_at": pa.timestamp("us")}
+    return pa.schema([
+        (column, types.get(column, pa.string() if column in TEXT_COLUMNS else pa.float64()))
+        for column in columns
+    ])
+
+
+def iter_evaluation_rows(
+    columns: Optional[List[str]] = None,
+    chunk_size: Optional[int] = None,
+    date_filter: str = None,
+    score_filter: float = None,
+    search_term: str = None
+) -> Iterator[List[tuple]]:
+    """
+    Stream evaluations as lists of up to `chunk_size` row tuples, oldest first
+    
+    Rows are fetched with a server-side cursor (yield_per), so only one chunk
+    is held in memory at a time. `columns` (default: EXPORT_COLUMNS) picks
+    the fields and their order; response bodies are joined from text_content
+    only when selected. Filters are those of get_evaluations_count.
+    
+    Raises:
+        ValueError: for unknown column names
+    """
+    columns = columns or EXPORT_COLUMNS
+    unknown = [column for column in columns if column not in EXPORT_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)} (choose from {', '.join(EXPORT_COLUMNS)})")
+    chunk_size = chunk_size or Config.EXPORT_CHUNK_SIZE
+    
+    texts = {"llm_response": aliased(TextContent), "actual_response": aliased(TextContent)}
+    selected = [
+        texts[column].text.label(column) if column in texts else getattr(Evaluation, column)
+        for column in columns
+    ]
+    with get_session() as session:
+        query = session.query(*selected).select_from(Evaluation)
+        for column, text_content in texts.items():
+            if column in columns:
+                query = query.outerjoin(text_content, text_content.content_hash == getattr(Evaluation, f"{column}_hash"))
+        query = _apply_filters(query, date_filter, score_filter, search_term)
+        rows = iter(query.order_by(Evaluation.evaluation_id).yield_per(chunk_size))
+        while True:
+            chunk = [tuple(row) for row in islice(rows, chunk_size)]
+            if not chunk:
+                break
+            yield chunk
+
+
+def export_evaluations(
+    path: str,
+    file_format: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    chunk_size: Optional[int] = None,
+    **filters
+) -> int:
+    """
+    Write evaluations to a Parquet, Arrow IPC or CSV file, chunk by chunk
+    
+    The format follows the file suffix unless `file_format` ("parquet",
+    "arrow" or "csv") is given. Parquet and Arrow files get one row group
+    or record batch per chunk and load straight into pandas
+    (pd.read_parquet, pd.read_feather). `columns`, `chunk_size` and
+    `filters` are passed to iter_evaluation_rows.
+    
+    Returns:
+        Number of evaluations written
+    """
+    file_format = _file_format(path, file_format)
+    columns = columns or EXPORT_COLUMNS
+    chunks = iter_evaluation_rows(columns, chunk_size, **filters)
+    written = 0
+    
+    if file_format == "csv":
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for chunk in chunks:
+                writer.writerows(
+                    ["" if value is None else value.isoformat() if isinstance(value, datetime) else value for value in row]
+                    for row in chunk
+                )
+                written += len(chunk)
+        return written
+    
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    schema = _arrow_schema(columns)
+    if file_format == "parquet":
+        writer = pq.ParquetWriter(path, schema, compression="zstd")
+    else:
+        writer = pa.ipc.new_file(path, schema)
+    try:
+        for chunk in chunks:
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(zip(*chunk), schema)],
+                schema=schema
+            ))
+            written += len(chunk)
+    finally:
+        writer.close()
+    return written
+
+
+def _read_records(path: str, file_format: str, chunk_size: int) -> Iterator[Dict[str, object]]:
+    if file_format == "csv":
+        with open(path, newline="", encoding="utf-8") as f:
+            for record in csv.DictReader(f):
+                yield {
+                    key: None if value == "" else
+                    datetime.fromisoformat(value) if key == "created_at" else
+                    float(value) if key in NUMERIC_COLUMNS else
+                    value
+                    for key, value in record.items()
+                }
+        return
+    
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    
+    if file_format == "parquet":
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_size)
+    else:
+        reader = pa.ipc.open_file(path)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    for batch in batches:
+        yield from batch.to_pylist()
+
+
+def _evaluation_item(record: Dict[str, object], weights: Dict) -> dict:
+    scores = {column: record.get(column) or 0.0 for column in CRITERIA_COLUMNS}
+    overall_score = record.get("overall_score")
+    if overall_score is None:
+        overall_score = sum(weight * scores[criterion.value] for criterion, weight in weights.items())
+    return {
+        "llm_response": record.get("llm_response") or "",
+        "actual_response": record.get("actual_response") or "",
+        "scores": scores,
+        "overall_score": overall_score,
+        "notes": record.get("notes"),
+        "created_at": record.get("created_at")
+    }
+
+
+def import_evaluations(path: str, file_format: Optional[str] = None, chunk_size: Optional[int] = None) -> int:
+    """
+    Load evaluations from a file written by export_evaluations (or any file
+    with the same column names)
+    
+    Rows are read and stored in chunks of `chunk_size` with
+    create_evaluations_bulk, one transaction per chunk. llm_response and
+    actual_response are required; missing criterion scores count as 0, a
+    missing overall_score is computed with the current weights and a
+    missing created_at becomes the import time. Evaluations get new ids.
+    
+    Returns:
+        Number of evaluations imported
+    """
+    file_format = _file_format(path, file_format)
+    chunk_size = chunk_size or Config.EXPORT_CHUNK_SIZE
+    weights = get_weights()
+    
+    records = _read_records(path, file_format, chunk_size)
+    first = next(records, None)
+    if first is None:
+        return 0
+    missing = {"llm_response", "actual_response"} - first.keys()
+    if missing:
+        raise ValueError(f"{path} has no {', '.join(sorted(missing))} column")
+    
+    items = (_evaluation_item(record, weights) for record in chain([first], records))
+    return create_evaluations_bulk(items, chunk_size=chunk_size)
+
@@ -0,0 +1,43 @@
+from typing import Dict, Mapping, Optional, Union
+from sqlalchemy import literal
+from models.enums import EvaluationCriteria
+from models.models import Evaluation
+from core.config import Config
+
+# A profile name from Config.WEIGHT_PROFILES or a {criterion: weight} mapping
+WeightProfile = Union[str, Mapping[Union[EvaluationCriteria, str], float]]
+
+
+def get_weights(weight_profile: Optional[WeightProfile] = None) -> Dict[EvaluationCriteria, float]:
+    """
+    Weight of every criterion for `weight_profile`
+    
+    None means Config.EVALUATION_CRITERIA_WEIGHTS, the weights applied when
+    evaluations are stored. Criteria missing from a profile weigh 0.
+    
+    Raises:
+        ValueError: for unknown profile names or criteria
+    """
+    if weight_profile is None:
+        weight_profile = Config.EVALUATION_CRITERIA_WEIGHTS
+    elif isinstance(weight_profile, str):
+        if weight_profile not in Config.WEIGHT_PROFILES:
+            raise ValueError(f"Unknown weight profile: {weight_profile} (choose from {', '.join(Config.WEIGHT_PROFILES)})")
+        weight_profile = Config.WEIGHT_PROFILES[weight_profile]
+    weights = {EvaluationCriteria(criterion): float(weight) for criterion, weight in weight_profile.items()}
+    return {criterion: weights.get(criterion, 0.0) for criterion in Config.EVALUATION_CRITERIA_LIST}
+
+
+def weighted_score(weight_profile: Optional[WeightProfile] = None):
+    """SQL expression computing the overall score of an evaluation row from its stored criterion scores"""
+    terms = [
+        getattr(Evaluation, criterion.value) * weight
+        for criterion, weight in get_weights(weight_profile).items()
+        if weight
+    ]
+    return sum(terms[1:], terms[0]) if terms else literal(0.0)
+
+
+def score_column(weight_profile: Optional[WeightProfile] = None):
+    """The stored overall_score without a profile, otherwise the profile's weighted_score"""
+    return Evaluation.overall_score if weight_profile is None else weighted_score(weight_profile)
@@ -0,0 +1,122 @@
+import re
+from typing import List, Tuple
+from sqlalchemy import column, func, literal_column, select, table
+from models.models import Evaluation, TextContent
+from core.database import get_session, get_search_backend
+
+# A quoted phrase or a bare word of the search box
+_SEARCH_TERM = re.compile(r'"([^"]*)"|(\S+)')
+
+_text_content_fts = table("text_content_fts", column("rowid"))
+_search_vector = literal_column("text_content.search_vector")
+
+
+def parse_search_query(search_term: str, prefix: bool = True) -> List[Tuple[List[str], bool]]:
+    """
+    Split search box input into terms that must all match
+
+    "quoted text" is an exact phrase; a bare word matches as a prefix when
+    `prefix` is set or it ends with `*`, and otherwise as a whole word.
+
+    Returns:
+        List of (words, is_prefix) tuples, where the last word of a term is
+        the one matched as a prefix
+    """
+    terms = []
+    for phrase, word in _SEARCH_TERM.findall(search_term or ""):
+        words = re.findall(r'\w+', phrase or word)
+        if words:
+            terms.append((words, not phrase and (prefix or word.endswith('*'))))
+    return terms
+
+
+def to_fts5_query(terms: List[Tuple[List[str], bool]]) -> str:
+    return " ".join(f'"{" ".join(words)}"' + (" *" if is_prefix else "") for words, is_prefix in terms)
+
+
+def to_tsquery(terms: List[Tuple[List[str], bool]]) -> str:
+    return " & ".join(
+        "(" + " <-> ".join(words) + (":*" if is_prefix else "") + ")"
+        for words, is_prefix in terms
+    )
+
+
+def _matching_texts(search_term: str, prefix: bool = True, ranked: bool = False):
+    """
+    SELECT of the content_hash of every text matching `search_term`, plus its
+    rank when `ranked` (higher is better; 0 without a search index)
+    """
+    terms = parse_search_query(search_term, prefix)
+    backend = get_search_backend()
+
+    if terms and backend == "fts5":
+        match = literal_column("text_content_fts").op("MATCH")(to_fts5_query(terms))
+        rank = -func.bm25(literal_column("text_content_fts"))
+        return (
+            select(TextContent.content_hash, *([rank.label("rank")] if ranked else []))
+            .join(_text_content_fts, _text_content_fts.c.rowid == TextContent.content_id)
+            .where(match)
+        )
+
+    if terms and backend == "tsvector":
+        query = func.to_tsquery("english", to_tsquery(terms))
+        rank = func.ts_rank(_search_vector, query)
+        return (
+            select(TextContent.content_hash, *([rank.label("rank")] if ranked else []))
+            .where(_search_vector.op("@@")(query))
+        )
+
+    # No search index (or nothing indexable in the input): substring scan
+    return (
+        select(TextContent.content_hash, *([literal_column("0.0").label("rank")] if ranked else []))
+        .where(TextContent.text.ilike(f"%{search_term}%"))
+    )
+
+
+def search_filter(search_term: str, prefix: bool = True):
+    """SQL condition matching evaluations whose LLM or actual response contains `search_term`"""
+    matches = _matching_texts(search_term, prefix)
+    return Evaluation.llm_response_hash.in_(matches) | Evaluation.actual_response_hash.in_(matches)
+
+
+def search_evaluations(
+    search_term: str,
+    limit: int = 20,
+    offset: int = 0,
+    prefix: bool = True
+) -> List[Tuple[Evaluation, float]]:
+    """
+    Full-text search over LLM and actual responses, best matches first
+
+    Supports "exact phrases", prefix* matches and implicit AND between terms
+    (see parse_search_query); all terms must occur in the same response.
+    An evaluation's rank is the sum of the ranks of its matching responses.
+
+    Returns:
+        List of (evaluation, rank) tuples, with both response bodies loaded;
+        a higher rank is a better match. Without a search index every match
+        has rank 0 and newest come first.
+    """
+    from repositories.evaluation import attach_texts
+
+    if not parse_search_query(search_term, prefix):
+        return []
+
+    matches = _matching_texts(search_term, prefix, ranked=True).subquery()
+    llm_match = matches.alias("llm_match")
+    actual_match = matches.alias("actual_match")
+    rank = func.coalesce(llm_match.c.rank, 0.0) + func.coalesce(actual_match.c.rank, 0.0)
+
+    with get_session() as session:
+        rows = (
+            session.query(Evaluation, rank.label("rank"))
+            .outerjoin(llm_match, llm_match.c.content_hash == Evaluation.llm_response_hash)
+            .outerjoin(actual_match, actual_match.c.content_hash == Evaluation.actual_response_hash)
+            .filter((llm_match.c.content_hash.isnot(None)) | (actual_match.c.content_hash.isnot(None)))
+            .order_by(rank.desc(), Evaluation.created_at.desc())
+            .offset(offset)
+            .limit(limit)
+            .all()
+        )
+        attach_texts(session, [evaluation for evaluation, _ in rows])
+        return [(evaluation, float(rank)) for evaluation, rank in rows]